@@ -12,10 +12,13 @@ if str(ROOT) not in sys.path:
 	sys.path.append(str(ROOT))
 
 from src.exchange.binance_futures_client import BinanceUSDMClient
+from src.exchange.instrument import Instrument
 from src.data.market_data import fetch_futures_klines_df
-from src.strategy.ema_cross import add_ema_features
 from src.backtest.backtester import run_backtest
-from src.strategy.indicators import compute_bollinger_bands
+from src.risk.performance import PerformanceTracker
+from src.strategy.pipeline import bollinger, compute_features, ema_cross
+from src.data.downsample import downsample_ohlcv, downsample_series, candle_budget, line_budget
+from src.bus.ring import RingReader, ring_path
 
 st.set_page_config(page_title="币安USDM合约 · EMA金叉看板", layout="wide")
 st.title("币安 USDM 合约 · EMA 金叉看板")
@@ -42,6 +45,9 @@ with st.sidebar:
 	market_only = st.checkbox("仅展示行情", value=True)
 	auto_refresh = st.checkbox("自动刷新", value=True)
 	refresh_seconds = st.number_input("刷新间隔(秒)", min_value=2, max_value=60, value=5, step=1)
+	chart_width = st.number_input("图表宽度(像素)", min_value=400, max_value=4000, value=1400, step=100)
+	bus_dir = st.text_input("本地行情总线目录（可选）", value=os.getenv("MARKET_BUS_DIR", ""))
+	bus_max_age = st.number_input("总线数据最长延迟(秒)", min_value=1, max_value=3600, value=60, step=5)
 
 # 自动刷新（无需点击运行）
 if auto_refresh:
@@ -56,30 +62,48 @@ os.environ["BINANCE_FAPI_BASE_URL"] = base_url
 client = BinanceUSDMClient(api_key=api_key or None, api_secret=api_secret or None, use_testnet=use_testnet)
 
 try:
-	# 自动退避：在 429 时逐步降低 limit 并重试
-	cur_limit = int(limit)
-	last_err: Exception | None = None
-	for _ in range(3):
+	# 优先读取本地行情总线（bus-publish 进程写入），不发网络请求
+	df = None
+	bus_path = ring_path(bus_dir, symbol, interval) if bus_dir else None
+	if bus_path is not None and bus_path.exists():
+		# 与 BusUSDMClient.get_klines 相同的规则：数据过旧或条数不足时回退到网络拉取
+		reader = RingReader(bus_path)
 		try:
-			df: pd.DataFrame = fetch_futures_klines_df(client, symbol, interval, limit=cur_limit)
-			break
-		except Exception as e:  # noqa: BLE001
-			last_err = e
-			msg = str(e)
-			if "429" in msg or "Too Many Requests" in msg:
-				cur_limit = max(100, int(cur_limit * 0.6))
-				st.info(f"命中限流，自动将K线数量降至 {cur_limit} 并重试……")
-				continue
+			if reader.serves(int(limit), float(bus_max_age)):
+				bus_df = reader.frame(int(limit))
+				df = bus_df[["open", "high", "low", "close", "volume"]]
+				df.attrs["version"] = bus_df.attrs["version"]
+				st.caption(f"数据来自本地行情总线：{bus_path}（{reader.age_seconds():.0f} 秒前更新）")
 			else:
-				raise
-	else:
-		raise last_err if last_err else RuntimeError("拉取失败")
+				st.caption(f"本地行情总线数据过旧或不足 {int(limit)} 根，改为从交易所拉取")
+		finally:
+			reader.close()
+
+	if df is None:
+		# 自动退避：在 429 时逐步降低 limit 并重试
+		cur_limit = int(limit)
+		last_err: Exception | None = None
+		for _ in range(3):
+			try:
+				df: pd.DataFrame = fetch_futures_klines_df(client, symbol, interval, limit=cur_limit)
+				break
+			except Exception as e:  # noqa: BLE001
+				last_err = e
+				msg = str(e)
+				if "429" in msg or "Too Many Requests" in msg:
+					cur_limit = max(100, int(cur_limit * 0.6))
+					st.info(f"命中限流，自动将K线数量降至 {cur_limit} 并重试……")
+					continue
+				else:
+					raise
+		else:
+			raise last_err if last_err else RuntimeError("拉取失败")
 
 	if df is None or df.empty:
 		st.warning("未获取到K线数据。请更换公共域名、减小K线数量或检查网络/代理。")
 		raise SystemExit
-	feat = add_ema_features(df, fast=fast, slow=slow).dropna()
-	feat = compute_bollinger_bands(feat, period=int(bb_period), std_multiplier=float(bb_mult))
+	# 指标流水线：共享中间量、不复制 OHLCV，结果按数据版本缓存供回测复用
+	feat = compute_features(df, ema_cross(int(fast), int(slow)) + bollinger(int(bb_period), float(bb_mult)))
 
 	# 仅行情模式下不跑回测，直接画图
 	stats = None
@@ -89,33 +113,44 @@ try:
 
 	if stats is not None:
 		st.subheader("回测统计")
-		col1, col2, col3, col4 = st.columns(4)
+		perf = PerformanceTracker.from_backtest(res).snapshot()
+		col1, col2, col3, col4, col5, col6 = st.columns(6)
 		col1.metric("收益率", f"{stats['return_pct']:.2f}%")
 		col2.metric("最大回撤", f"{stats['max_dd_pct']:.2f}%")
 		col3.metric("夏普比率", f"{stats['sharpe']:.2f}")
 		col4.metric("交易次数", f"{stats['trades']}")
+		col5.metric("胜率", f"{perf.win_rate_pct:.1f}%")
+		col6.metric("持仓占比", f"{perf.exposure_pct:.1f}%")
+
+	# 按可视像素宽度降采样：蜡烛按桶聚合 OHLC，折线使用 LTTB + WebGL
+	max_points = line_budget(int(chart_width))
+	candles = downsample_ohlcv(df, candle_budget(int(chart_width)))
 
 	fig = go.Figure()
-	# 蜡烛图使用原始 df，保证总能显示
+	# 蜡烛图使用降采样后的原始 df，保证总能显示
 	fig.add_trace(go.Candlestick(
-		x=df.index,
-		open=df["open"], high=df["high"], low=df["low"], close=df["close"],
+		x=candles.index,
+		open=candles["open"], high=candles["high"], low=candles["low"], close=candles["close"],
 		name=symbol
 	))
 	# 指标叠加（使用已对齐的 feat）
 	if not feat.empty:
-		fig.add_trace(go.Scatter(x=feat.index, y=feat[f"ema_{fast}"], line=dict(color="#2ca02c"), name=f"EMA {fast}"))
-		fig.add_trace(go.Scatter(x=feat.index, y=feat[f"ema_{slow}"], line=dict(color="#d62728"), name=f"EMA {slow}"))
-		fig.add_trace(go.Scatter(x=feat.index, y=feat["bb_mid"], line=dict(color="#9467bd", width=1), name="BB Mid"))
-		fig.add_trace(go.Scatter(x=feat.index, y=feat["bb_upper"], line=dict(color="#8c564b", width=1), name="BB Upper"))
-		fig.add_trace(go.Scatter(x=feat.index, y=feat["bb_lower"], line=dict(color="#8c564b", width=1), name="BB Lower", fill=None))
+		for col, name, line in [
+			(f"ema_{fast}", f"EMA {fast}", dict(color="#2ca02c")),
+			(f"ema_{slow}", f"EMA {slow}", dict(color="#d62728")),
+			("bb_mid", "BB Mid", dict(color="#9467bd", width=1)),
+			("bb_upper", "BB Upper", dict(color="#8c564b", width=1)),
+			("bb_lower", "BB Lower", dict(color="#8c564b", width=1)),
+		]:
+			s = downsample_series(feat[col], max_points)
+			fig.add_trace(go.Scattergl(x=s.index, y=s.values, mode="lines", line=line, name=name))
 
 	fig.update_layout(height=700, xaxis_rangeslider_visible=False)
 	st.plotly_chart(fig, use_container_width=True)
 
-	# 仅行情模式下显示成交量；使用原始 df
+	# 仅行情模式下显示成交量；使用降采样后的桶成交量
 	fig_vol = go.Figure()
-	fig_vol.add_trace(go.Bar(x=df.index, y=df["volume"], name="成交量", marker_color="#888"))
+	fig_vol.add_trace(go.Bar(x=candles.index, y=candles["volume"], name="成交量", marker_color="#888"))
 	fig_vol.update_layout(height=250)
 	st.plotly_chart(fig_vol, use_container_width=True)
 
@@ -123,24 +158,26 @@ try:
 		# %B subplot（若有feat）
 		if not feat.empty:
 			fig_pb = go.Figure()
-			fig_pb.add_trace(go.Scatter(x=feat.index, y=feat["bb_percent_b"], mode="lines", name="%B", line=dict(color="#17becf")))
+			pb = downsample_series(feat["bb_percent_b"], max_points)
+			fig_pb.add_trace(go.Scattergl(x=pb.index, y=pb.values, mode="lines", name="%B", line=dict(color="#17becf")))
 			fig_pb.update_layout(height=200)
 			st.plotly_chart(fig_pb, use_container_width=True)
 
 		# 风控图
 		res = res if 'res' in locals() else run_backtest(df, fast=fast, slow=slow)
 		ec = res["equity_curve"].copy()
-		dd = (ec / ec.cummax()) - 1.0
+		dd = downsample_series((ec / ec.cummax()) - 1.0, max_points)
+		ec = downsample_series(ec, max_points)
 		st.subheader("趋势与风控图表")
 		c1, c2 = st.columns(2)
 		with c1:
 			fig_eq = go.Figure()
-			fig_eq.add_trace(go.Scatter(x=ec.index, y=ec.values, mode="lines", name="权益曲线", line=dict(color="#1f77b4")))
+			fig_eq.add_trace(go.Scattergl(x=ec.index, y=ec.values, mode="lines", name="权益曲线", line=dict(color="#1f77b4")))
 			fig_eq.update_layout(height=300)
 			st.plotly_chart(fig_eq, use_container_width=True)
 		with c2:
 			fig_dd = go.Figure()
-			fig_dd.add_trace(go.Scatter(x=dd.index, y=dd.values, mode="lines", name="回撤(%)", fill="tozeroy", line=dict(color="#ff7f0e")))
+			fig_dd.add_trace(go.Scattergl(x=dd.index, y=dd.values, mode="lines", name="回撤(%)", fill="tozeroy", line=dict(color="#ff7f0e")))
 			fig_dd.update_layout(height=300, yaxis_tickformat=",.0%")
 			st.plotly_chart(fig_dd, use_container_width=True)
 
@@ -171,16 +208,21 @@ try:
 					st.warning(f"设置杠杆失败：{e}")
 
 				from decimal import Decimal
-				filters = client.get_symbol_filters(symbol)
+				inst = Instrument.from_filters(symbol, client.get_symbol_filters(symbol))
 				if btn_open:
-					qty = client.round_to_step(Decimal(str(qty_preview)), filters.lot_step_size)
-					try:
-						res_order = client.new_market_order(symbol=symbol, side="BUY", quantity=qty)
-						st.success(f"已开多：订单ID {res_order.get('orderId')}")
-					except Exception as e:
-						st.error(f"开多失败：{e}")
+					price = Decimal(str(last_price))
+					qty = inst.size(Decimal(str(quote_size)), price, int(leverage))
+					reason = inst.check(qty, price)
+					if reason:
+						st.error(f"开多失败：{reason}")
+					else:
+						try:
+							res_order = client.new_market_order(symbol=symbol, side="BUY", quantity=qty)
+							st.success(f"已开多：订单ID {res_order.get('orderId')}")
+						except Exception as e:
+							st.error(f"开多失败：{e}")
 				if btn_close:
-					qty = filters.lot_min_qty
+					qty = inst.min_quantity
 					try:
 						res_order = client.new_market_order(symbol=symbol, side="SELL", quantity=qty, reduce_only=True)
 						st.success(f"已平多（reduceOnly）：订单ID {res_order.get('orderId')}")
@@ -36,7 +36,7 @@ def run_backtest(
         "sharpe": float(_sharpe(net)),
         "trades": int((data["cross"].abs() == 1).sum()),
     }
-    return {"equity_curve": equity, "stats": stats, "data": data}
+    return {"equity_curve": equity, "stats": stats, "data": data, "returns": net, "position": position}
 
 
 def _max_drawdown(equity: pd.Series) -> float:
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+METRICS = ["return_pct", "max_dd_pct", "sharpe"]
+# 每个批次的矩阵元素上限（约 4MB/矩阵，留在缓存附近），10k 条路径 x 10 万根也只占常数内存
+DEFAULT_MAX_ELEMENTS = 500_000
+
+
+# ---------- Path metrics ----------
+def path_metrics(returns: np.ndarray, period: int = 365) -> Dict[str, np.ndarray]:
+    """Row-wise ``return_pct``, ``max_dd_pct`` and ``sharpe`` of a (paths x bars) return matrix.
+
+    Same definitions as ``run_backtest`` stats: compounded equity, drawdown
+    against the running peak of that equity, and ``_sharpe`` (ddof=1).
+    The matrix is overwritten with the equity curves.
+    """
+    returns = np.atleast_2d(returns)
+    n = returns.shape[1]
+    mean = returns.mean(axis=1)
+    if n > 1:
+        centered_sq = np.einsum("ij,ij->i", returns, returns) - n * mean * mean
+        std = np.sqrt(np.maximum(centered_sq, 0.0) / (n - 1))
+    else:
+        std = np.zeros(len(returns))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, np.sqrt(period) * mean / std, 0.0)
+
+    equity = returns
+    equity += 1.0
+    np.cumprod(equity, axis=1, out=equity)
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.divide(equity, peak, out=peak)
+    return {
+        "return_pct": (equity[:, -1] - 1.0) * 100.0,
+        "max_dd_pct": (peak.min(axis=1) - 1.0) * 100.0,
+        "sharpe": sharpe,
+    }
+
+
+# ---------- Resamplers (one batch of paths each) ----------
+def block_bootstrap(returns: np.ndarray, n_paths: int, rng: np.random.Generator, block: int) -> np.ndarray:
+    """Circular block bootstrap: paths of ``len(returns)`` bars stitched from random blocks."""
+    n = len(returns)
+    n_blocks = -(-n // block)
+    # 首尾相接后按窗口视图取块，避免生成 (路径 x K线) 的下标矩阵
+    windows = np.lib.stride_tricks.sliding_window_view(np.concatenate([returns, returns[: block - 1]]), block)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    return windows[starts].reshape(n_paths, -1)[:, :n]
+
+
+def trade_shuffle(trades: np.ndarray, n_paths: int, rng: np.random.Generator, replace: bool = False) -> np.ndarray:
+    """Trade sequences in random order (``replace=True`` resamples trades with replacement)."""
+    if replace:
+        return trades[rng.integers(0, len(trades), size=(n_paths, len(trades)))]
+    return trades[np.argsort(rng.random((n_paths, len(trades))), axis=1)]
+
+
+def cost_perturbation(
+    returns: np.ndarray,
+    events: np.ndarray,
+    n_paths: int,
+    rng: np.random.Generator,
+    fee_bps: float,
+    fee_range: Sequence[float] = (0.5, 2.0),
+    slippage_bps: float = 2.0,
+) -> np.ndarray:
+    """Re-price every fee event with a random fee multiplier and half-normal slippage.
+
+    ``returns`` are net of ``fee_bps`` on each ``events`` bar; the fee is
+    added back and replaced by ``fee_bps * U(fee_range) + |N(0, slippage_bps)|``
+    per event and path.
+    """
+    pos = np.flatnonzero(events)
+    gross = returns.copy()
+    gross[pos] += fee_bps / 10000.0
+    paths = np.broadcast_to(gross, (n_paths, len(gross))).copy()
+    fee = fee_bps * rng.uniform(fee_range[0], fee_range[1], size=(n_paths, 1))
+    slip = np.abs(rng.normal(0.0, slippage_bps, size=(n_paths, len(pos))))
+    paths[:, pos] -= (fee + slip) / 10000.0
+    return paths
+
+
+# ---------- Driver ----------
+def _run_chunk(
+    sampler: Callable[..., np.ndarray], data: tuple, kwargs: dict, n_paths: int, seed: np.random.SeedSequence, period: int
+) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return path_metrics(sampler(*data, n_paths, rng, **kwargs), period=period)
+
+
+def simulate(
+    sampler: Callable[..., np.ndarray],
+    data: tuple,
+    n_paths: int,
+    length: int,
+    kwargs: Optional[dict] = None,
+    seed: Optional[int] = None,
+    period: int = 365,
+    workers: int = 1,
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+) -> Dict[str, np.ndarray]:
+    """Run ``n_paths`` resamples in batches of at most ``max_elements`` matrix cells.
+
+    Each batch gets its own child seed, so results depend on ``seed`` only,
+    not on ``workers``; ``workers > 1`` spreads batches over a process pool.
+    """
+    batch = max(1, min(n_paths, max_elements // max(length, 1)))
+    sizes = [min(batch, n_paths - i) for i in range(0, n_paths, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    kwargs = kwargs or {}
+    if workers <= 1 or len(sizes) == 1:
+        parts = [_run_chunk(sampler, data, kwargs, k, s, period) for k, s in zip(sizes, seeds)]
+    else:
+        n = len(sizes)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, [sampler] * n, [data] * n, [kwargs] * n, sizes, seeds, [period] * n))
+    return {m: np.concatenate([p[m] for p in parts]) for m in METRICS}
+
+
+def confidence_intervals(samples: Dict[str, np.ndarray], alpha: float = 0.05) -> pd.DataFrame:
+    rows = {}
+    for m in METRICS:
+        x = samples[m]
+        rows[m] = {
+            "mean": float(x.mean()),
+            "lower": float(np.quantile(x, alpha / 2)),
+            "median": float(np.median(x)),
+            "upper": float(np.quantile(x, 1 - alpha / 2)),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+# ---------- Backtest helpers ----------
+def trade_returns(returns: pd.Series, position: pd.Series) -> np.ndarray:
+    """Compounded net return of every round trip, from entry bar to exit bar inclusive."""
+    pos = position.to_numpy() != 0
+    net = returns.to_numpy()
+    change = np.flatnonzero(np.diff(pos.astype(np.int8)))
+    entries = change[pos[change + 1]] + 1
+    exits = change[~pos[change + 1]] + 1
+    if len(pos) and pos[0]:
+        entries = np.r_[0, entries]
+    # 退出所在K线仍承担持仓收益和手续费；未平仓的交易算到最后一根
+    ends = np.append(exits, len(net) - 1)[np.searchsorted(exits, entries, side="right")]
+    growth = np.cumprod(1.0 + net)
+    growth = np.insert(growth, 0, 1.0)
+    return growth[ends + 1] / growth[entries] - 1.0
+
+
+def run_robustness(
+    result: dict,
+    n_paths: int = 1000,
+    fee_bps: float = 10.0,
+    block: Optional[int] = None,
+    slippage_bps: float = 2.0,
+    alpha: float = 0.05,
+    seed: Optional[int] = None,
+    period: int = 365,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """Confidence intervals for a ``run_backtest`` result under three resampling schemes.
+
+    ``bootstrap`` resamples blocks of bar returns, ``trade_bootstrap``
+    resamples round trips with replacement and ``costs`` re-prices fees and
+    slippage. Trade paths are sequences of trades, not bars, so only their
+    return and drawdown are reported. ``fee_bps`` must be the value the
+    backtest ran with.
+    """
+    returns = result["returns"].to_numpy(dtype=float)
+    events = (result["data"]["cross"] != 0).to_numpy()
+    block = block or max(1, round(len(returns) ** (1 / 3)))
+    common = dict(seed=seed, period=period, workers=workers)
+
+    frames = {
+        "bootstrap": simulate(block_bootstrap, (returns,), n_paths, len(returns), {"block": block}, **common),
+        "costs": simulate(
+            cost_perturbation,
+            (returns, events),
+            n_paths,
+            len(returns),
+            {"fee_bps": fee_bps, "slippage_bps": slippage_bps},
+            **common,
+        ),
+    }
+    tables = {k: confidence_intervals(v, alpha) for k, v in frames.items()}
+    trades = trade_returns(result["returns"], result["position"])
+    if len(trades) > 1:
+        # 不放回的重排只改变顺序，收益与 Sharpe 在每条路径上都相同；按 365 年化每笔收益也没有意义
+        samples = simulate(trade_shuffle, (trades,), n_paths, len(trades), {"replace": True}, **common)
+        tables["trade_bootstrap"] = confidence_intervals(samples, alpha).drop(index="sharpe")
+    return pd.concat(tables, names=["method", "metric"])
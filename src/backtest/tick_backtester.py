@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.aggtrades import TickChunk, iter_ticks
+from src.data.resample import INTERVAL_MS
+from src.risk.performance import PerformanceTracker
+from src.strategy.ema_scalar import EmaState
+
+
+@dataclass
+class _Order:
+    side: int  # 1 = buy (open long), -1 = sell (close long)
+    arrival_ms: int
+    signal_ms: int
+    signal_price: float
+    skip: int
+
+
+class TickBacktester:
+    """EMA crossover replayed over aggTrades, bar by bar and fill by fill.
+
+    Bars are built on the fly from trade times (epoch-aligned, like Binance
+    klines). At each bar close the EMA signal is updated; a flip to long
+    (short) sends a market buy (sell) that reaches the exchange
+    ``latency_ms`` after the close. It fills at the first trade after that,
+    skipping ``queue_trades`` trades ahead of it. With ``match_side`` only
+    trades whose aggressor was on the same side count, i.e. a buy fills at
+    the ask side of the tape.
+
+    State is O(1) in the number of ticks: the open bar, two EMAs, the
+    position and at most one pending order; metrics are streamed into a
+    ``PerformanceTracker``.
+    """
+
+    def __init__(
+        self,
+        interval: str = "1m",
+        fast: int = 12,
+        slow: int = 26,
+        fee_bps: float = 10.0,
+        latency_ms: int = 50,
+        slippage_bps: float = 0.0,
+        queue_trades: int = 0,
+        match_side: bool = True,
+        period: int = 365,
+    ) -> None:
+        self.interval = interval
+        self.interval_ms = INTERVAL_MS[interval]
+        self.fast = fast
+        self.slow = slow
+        self.fee = fee_bps / 10000.0
+        self.latency_ms = latency_ms
+        self.slippage = slippage_bps / 10000.0
+        self.queue_trades = queue_trades
+        self.match_side = match_side
+        self.performance = PerformanceTracker(period=period)
+
+        self._ema_fast = EmaState(fast)
+        self._ema_slow = EmaState(slow)
+        self._signal = 0
+        self._bar: Optional[int] = None
+        self._first_bar: Optional[int] = None
+        self._last_bar: Optional[int] = None
+        self._close = float("nan")
+        self._position = 0
+        self._mark = 0.0
+        self._growth = 1.0
+        self._fills_in_bar = 0
+        self._held_in_bar = False
+        self._pending: Optional[_Order] = None
+        self.ticks = 0
+        self.fills = 0
+        self._slippage_sum = 0.0
+        self._delay_sum = 0
+
+    # -------- Streaming --------
+    def feed(self, chunk: TickChunk) -> None:
+        t, p, maker = chunk.time, chunk.price, chunk.buyer_maker
+        n = len(t)
+        if not n:
+            return
+        self.ticks += n
+        bucket = t // self.interval_ms
+        cuts = np.flatnonzero(bucket[1:] != bucket[:-1]) + 1
+        starts = np.r_[0, cuts].tolist()
+        ends = np.r_[cuts, n].tolist()
+        buckets = bucket[starts].tolist()
+        for s, e, b in zip(starts, ends, buckets):
+            if b != self._bar:
+                if self._bar is not None:
+                    self._close_bar()
+                self._open_bar(b)
+            if self._pending is not None:
+                self._try_fill(t, p, maker, s, e)
+            self._close = float(p[e - 1])
+
+    def finish(self) -> dict:
+        if self._bar is not None:
+            self._close_bar()
+            self._bar = None
+        return self.stats()
+
+    # -------- Bars --------
+    def _open_bar(self, bucket: int) -> None:
+        self._bar = bucket
+        if self._first_bar is None:
+            self._first_bar = bucket
+        self._held_in_bar = self._position != 0
+
+    def _close_bar(self) -> None:
+        close = self._close
+        self._last_bar = self._bar
+        if self._position:
+            self._growth *= close / self._mark
+            self._mark = close
+        self.performance.update_bar(self._growth - 1.0 - self.fee * self._fills_in_bar, self._held_in_bar)
+        self._growth = 1.0
+        self._fills_in_bar = 0
+
+        self._ema_fast.update(close)
+        self._ema_slow.update(close)
+        f, s = self._ema_fast.value, self._ema_slow.value
+        signal = 1 if f > s else -1 if f < s else 0
+        cross = signal - self._signal
+        self._signal = signal
+
+        close_ms = (self._bar + 1) * self.interval_ms
+        side = 0
+        if cross > 0 and signal == 1:
+            side = 1
+        elif cross < 0 and signal == -1:
+            side = -1
+        if side == 0:
+            return
+        # 反向信号撤销尚未成交的旧单
+        self._pending = None
+        if (side > 0 and self._position == 0) or (side < 0 and self._position != 0):
+            self._pending = _Order(side, close_ms + self.latency_ms, close_ms, close, self.queue_trades)
+
+    # -------- Fills --------
+    def _try_fill(self, t: np.ndarray, p: np.ndarray, maker: np.ndarray, s: int, e: int) -> None:
+        order = self._pending
+        if t[e - 1] < order.arrival_ms:
+            return
+        i0 = s + int(np.searchsorted(t[s:e], order.arrival_ms))
+        if self.match_side:
+            # 买单吃卖盘：主动买成交 (is_buyer_maker=False)；卖单相反
+            hits = np.flatnonzero(maker[i0:e] == (order.side < 0))
+        else:
+            hits = np.arange(e - i0)
+        if len(hits) <= order.skip:
+            order.skip -= len(hits)
+            return
+        i = i0 + int(hits[order.skip])
+        price = float(p[i]) * (1.0 + order.side * self.slippage)
+        self._apply_fill(order, price, int(t[i]))
+
+    def _apply_fill(self, order: _Order, price: float, time_ms: int) -> None:
+        if order.side > 0:
+            self._position = 1
+            self._mark = price
+            self._held_in_bar = True
+        else:
+            self._growth *= price / self._mark
+            self._position = 0
+        self._fills_in_bar += 1
+        self._pending = None
+        self.fills += 1
+        self.performance.record_fill()
+        self._slippage_sum += order.side * (price / order.signal_price - 1.0)
+        self._delay_sum += time_ms - order.signal_ms
+
+    # -------- Results --------
+    def stats(self) -> dict:
+        """Same keys as ``run_backtest`` stats, plus tick/fill diagnostics."""
+        snap = self.performance.snapshot()
+        start = end = ""
+        if self._first_bar is not None and self._last_bar is not None:
+            start = str(pd.to_datetime((self._first_bar + 1) * self.interval_ms - 1, unit="ms"))
+            end = str(pd.to_datetime((self._last_bar + 1) * self.interval_ms - 1, unit="ms"))
+        return {
+            "start": start,
+            "end": end,
+            "bars": snap.bars,
+            "fast": self.fast,
+            "slow": self.slow,
+            "final_equity": snap.final_equity,
+            "return_pct": snap.return_pct,
+            "max_dd_pct": snap.max_dd_pct,
+            "sharpe": snap.sharpe,
+            "trades": snap.trades,
+            "ticks": self.ticks,
+            "latency_ms": self.latency_ms,
+            "avg_slippage_bps": self._slippage_sum / self.fills * 10000.0 if self.fills else 0.0,
+            "avg_fill_delay_ms": self._delay_sum / self.fills if self.fills else 0.0,
+        }
+
+
+def run_tick_backtest(
+    paths: Iterable[Path],
+    interval: str = "1m",
+    fast: int = 12,
+    slow: int = 26,
+    fee_bps: float = 10.0,
+    latency_ms: int = 50,
+    slippage_bps: float = 0.0,
+    queue_trades: int = 0,
+    match_side: bool = True,
+    chunksize: int = 1_000_000,
+    verify: bool = False,
+) -> dict:
+    """Stream tick files / aggTrades archives (oldest first) through ``TickBacktester``."""
+    engine = TickBacktester(
+        interval=interval,
+        fast=fast,
+        slow=slow,
+        fee_bps=fee_bps,
+        latency_ms=latency_ms,
+        slippage_bps=slippage_bps,
+        queue_trades=queue_trades,
+        match_side=match_side,
+    )
+    for chunk in iter_ticks(paths, chunksize=chunksize, verify=verify):
+        engine.feed(chunk)
+    return {"stats": engine.finish(), "performance": engine.performance.snapshot()}
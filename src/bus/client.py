@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.bus.ring import RingReader, ring_path
+from src.exchange.binance_futures_client import BinanceUSDMClient
+
+
+class BusUSDMClient(BinanceUSDMClient):
+	"""``BinanceUSDMClient`` that serves klines from the local market-data bus.
+
+	A feed is used when its ring exists, holds at least ``limit`` bars and was
+	updated within ``max_age`` seconds; otherwise the request goes to Binance as
+	usual. Everything else (filters, orders, account) is unchanged.
+	"""
+
+	def __init__(self, root: str | Path, *args: Any, max_age: float = 60.0, **kwargs: Any) -> None:
+		super().__init__(*args, **kwargs)
+		self.root = Path(root)
+		self.max_age = max_age
+		self._readers: Dict[Tuple[str, str], Optional[RingReader]] = {}
+
+	def reader(self, symbol: str, interval: str) -> Optional[RingReader]:
+		key = (symbol.upper(), interval)
+		if self._readers.get(key) is None:
+			path = ring_path(self.root, symbol, interval)
+			self._readers[key] = RingReader(path) if path.exists() else None
+		return self._readers[key]
+
+	def get_klines(self, symbol: str, interval: str, limit: int = 500) -> List[List[Any]]:
+		reader = self.reader(symbol, interval)
+		if reader is not None and reader.serves(limit, self.max_age):
+			return reader.klines(limit)
+		return super().get_klines(symbol=symbol, interval=interval, limit=limit)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.bus.ring import RingWriter, ring_path
+from src.data.market_data import fetch_futures_klines_df
+from src.data.resample import INTERVAL_MS
+from src.exchange.binance_futures_client import BinanceUSDMClient
+from src.strategy.pipeline import Node, bollinger, compute_features, ema_cross
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+# 单次请求上限；回填之后每轮只拉上次之后缺的几根，历史由发布进程自己维护
+_MAX_LIMIT = 1500
+
+
+class MarketDataPublisher:
+	"""Fetch klines once per box and publish bars + indicators to ring files.
+
+	Each (symbol, interval) gets its own ``RingWriter``. The publisher keeps a
+	``capacity``-bar window per feed to recompute indicators, so its memory is
+	bounded as well. Updates fetch every bar since the last one stored, so a
+	failed symbol or a stalled process never leaves a hole in the ring; after
+	a longer outage the window is refetched and the ring rewritten.
+	"""
+
+	def __init__(
+		self,
+		client: BinanceUSDMClient,
+		root: str | Path,
+		symbols: List[str],
+		interval: str = "1h",
+		capacity: int = 1000,
+		nodes: Optional[List[Node]] = None,
+		clock: Callable[[], float] = time.time,
+	) -> None:
+		self.client = client
+		self.root = Path(root)
+		self.symbols = [s.upper() for s in symbols]
+		self.interval = interval
+		self.capacity = capacity
+		self.nodes = nodes if nodes is not None else ema_cross(12, 26) + bollinger(20, 2.0)
+		self.feature_columns = [n.name for n in self.nodes if n.name]
+		self.clock = clock
+		self.interval_ms = INTERVAL_MS[interval]
+		self._frames: Dict[str, pd.DataFrame] = {}
+		self._writers: Dict[str, RingWriter] = {}
+
+	def _writer(self, symbol: str) -> RingWriter:
+		if symbol not in self._writers:
+			self._writers[symbol] = RingWriter(
+				ring_path(self.root, symbol, self.interval),
+				OHLCV + self.feature_columns,
+				capacity=self.capacity,
+				interval_ms=self.interval_ms,
+			)
+		return self._writers[symbol]
+
+	def _update_limit(self, old: Optional[pd.DataFrame]) -> Optional[int]:
+		"""Bars to fetch to continue ``old`` without a gap; ``None`` = refetch the window."""
+		if old is None or old.empty:
+			return None
+		last_close_ms = int(old.index[-1].value // 1_000_000)
+		missing = -(-(int(self.clock() * 1000) - last_close_ms) // self.interval_ms)
+		# 多取两根：覆盖上次可能未收盘的最后一根以及本机与服务器的时钟偏差
+		limit = max(missing, 0) + 2
+		return limit if limit <= min(self.capacity, _MAX_LIMIT) else None
+
+	def publish(self, symbol: str) -> int:
+		backfill = min(self.capacity, _MAX_LIMIT)
+		step = pd.Timedelta(milliseconds=self.interval_ms)
+		old = self._frames.get(symbol)
+		limit = self._update_limit(old)
+		new = fetch_futures_klines_df(self.client, symbol, self.interval, limit=limit or backfill)
+		if limit is None or new.index[0] > old.index[-1] + step:
+			if limit is not None:
+				new = fetch_futures_klines_df(self.client, symbol, self.interval, limit=backfill)
+			old = None
+		df = new if old is None else pd.concat([old[old.index < new.index[0]], new])
+		df = df.iloc[-self.capacity :]
+		self._frames[symbol] = df
+		feat = compute_features(df, self.nodes, cache=None)
+		out = pd.concat([df[OHLCV], feat], axis=1)
+
+		writer = self._writer(symbol)
+		last = writer.last_time()
+		first_new = int(new.index[0].value // 1_000_000)
+		if last is not None and first_new > last + self.interval_ms:
+			# 环中最后一根与新数据不相接（发布进程停机过久）：整窗重写，不留缺口
+			return writer.write_frame(out, replace=True)
+		# 只写入本次拉取的K线（含可能被修订的最后一根），其余已在环中
+		return writer.write_frame(out.iloc[-len(new) :])
+
+	def publish_all(self) -> None:
+		for symbol in self.symbols:
+			try:
+				self.publish(symbol)
+			except Exception as exc:  # noqa: BLE001 - one bad symbol must not stop the feed
+				print(f"Skip {symbol}: {exc}")
+
+	def run(self, poll: float = 5.0) -> None:
+		try:
+			while True:
+				started = time.monotonic()
+				self.publish_all()
+				time.sleep(max(0.0, poll - (time.monotonic() - started)))
+		finally:
+			self.close()
+
+	def close(self) -> None:
+		for writer in self._writers.values():
+			writer.close()
+		self._writers.clear()
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import time
+from pathlib import Path
+from typing import Any, List, Sequence, Tuple
+
+# 文件布局（小端）：
+#   [0, 4096)   头部：magic, header_size, capacity, ncols, interval_ms, seq, count, updated_ms, 列名
+#   [4096, ...) close_time(int64) x capacity，随后 float64 x capacity x ncols（按行存放）
+# seq 为 seqlock 计数：写入期间为奇数，读者在前后两次读到相同偶数值时数据一致。
+MAGIC = b"BNRING1\x00"
+HEADER_SIZE = 4096
+_HEADER = struct.Struct("<8sIIII")
+_SEQ_OFFSET = 24
+_COUNT_OFFSET = 32
+_UPDATED_OFFSET = 40
+_NAMES_OFFSET = 48
+_U64 = struct.Struct("<Q")
+_I64 = struct.Struct("<q")
+_U32 = struct.Struct("<I")
+_MAX_RETRIES = 10_000
+
+
+def ring_path(root: str | Path, symbol: str, interval: str) -> Path:
+	return Path(root) / f"{symbol.upper()}_{interval}.ring"
+
+
+def _file_size(capacity: int, ncols: int) -> int:
+	return HEADER_SIZE + 8 * capacity * (1 + ncols)
+
+
+def _read_layout(mm: mmap.mmap) -> Tuple[int, int, int, List[str]]:
+	magic, header_size, capacity, ncols, interval_ms = _HEADER.unpack_from(mm, 0)
+	if magic != MAGIC or header_size != HEADER_SIZE:
+		raise ValueError("Not a market-data ring file")
+	(length,) = _U32.unpack_from(mm, _NAMES_OFFSET)
+	start = _NAMES_OFFSET + 4
+	names = bytes(mm[start : start + length]).decode().split(",") if length else []
+	return capacity, ncols, interval_ms, names
+
+
+class RingWriter:
+	"""Single writer of one (symbol, interval) ring.
+
+	``write`` appends bars newer than the last stored one and overwrites the
+	last slot when the same (still open) bar is sent again. Only one writer
+	per file is supported; readers never block it.
+	"""
+
+	def __init__(self, path: str | Path, columns: Sequence[str], capacity: int = 1000, interval_ms: int = 0) -> None:
+		self.path = Path(path)
+		self.columns = list(columns)
+		self.capacity = capacity
+		self.interval_ms = interval_ms
+		names = ",".join(self.columns).encode()
+		if _NAMES_OFFSET + 4 + len(names) > HEADER_SIZE:
+			raise ValueError("Too many columns for the ring header")
+		size = _file_size(capacity, len(self.columns))
+
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		fresh = not self.path.exists() or self.path.stat().st_size == 0
+		self._fh = open(self.path, "r+b" if not fresh else "w+b")
+		if fresh:
+			self._fh.truncate(size)
+		self._mm = mmap.mmap(self._fh.fileno(), size)
+		if fresh:
+			_HEADER.pack_into(self._mm, 0, MAGIC, HEADER_SIZE, capacity, len(self.columns), interval_ms)
+			_U32.pack_into(self._mm, _NAMES_OFFSET, len(names))
+			self._mm[_NAMES_OFFSET + 4 : _NAMES_OFFSET + 4 + len(names)] = names
+		else:
+			layout = _read_layout(self._mm)
+			if layout != (capacity, len(self.columns), interval_ms, self.columns):
+				self.close()
+				raise ValueError(f"{self.path} has a different layout; remove it or use another bus directory")
+			# 上次写入中途退出时 seq 停在奇数，恢复为偶数
+			seq = self.seq
+			if seq & 1:
+				_U64.pack_into(self._mm, _SEQ_OFFSET, seq + 1)
+
+		import numpy as np
+
+		self._times = np.frombuffer(self._mm, dtype=np.int64, count=capacity, offset=HEADER_SIZE)
+		self._values = np.frombuffer(
+			self._mm, dtype=np.float64, count=capacity * len(self.columns), offset=HEADER_SIZE + 8 * capacity
+		).reshape(capacity, len(self.columns))
+
+	@property
+	def seq(self) -> int:
+		return _U64.unpack_from(self._mm, _SEQ_OFFSET)[0]
+
+	@property
+	def count(self) -> int:
+		return _U64.unpack_from(self._mm, _COUNT_OFFSET)[0]
+
+	def last_time(self) -> int | None:
+		count = self.count
+		return int(self._times[(count - 1) % self.capacity]) if count else None
+
+	def write(self, close_ms: Any, values: Any, replace: bool = False) -> int:
+		"""Store bars (close time in ms, rows in ``columns`` order); returns rows written.
+
+		``replace`` drops the ring's contents in the same update, e.g. when the
+		new bars do not continue the stored ones.
+		"""
+		import numpy as np
+
+		close_ms = np.asarray(close_ms, dtype=np.int64)
+		values = np.asarray(values, dtype=np.float64).reshape(len(close_ms), len(self.columns))
+		last = None if replace else self.last_time()
+		if last is not None:
+			keep = close_ms >= last
+			close_ms, values = close_ms[keep], values[keep]
+		if not len(close_ms):
+			return 0
+		count = 0 if replace else self.count
+		if last is not None and close_ms[0] == last:
+			count -= 1
+		close_ms, values = close_ms[-self.capacity :], values[-self.capacity :]
+		slots = (count + np.arange(len(close_ms))) % self.capacity
+
+		seq = self.seq
+		_U64.pack_into(self._mm, _SEQ_OFFSET, seq + 1)
+		self._times[slots] = close_ms
+		self._values[slots] = values
+		_U64.pack_into(self._mm, _COUNT_OFFSET, count + len(close_ms))
+		_I64.pack_into(self._mm, _UPDATED_OFFSET, int(time.time() * 1000))
+		_U64.pack_into(self._mm, _SEQ_OFFSET, seq + 2)
+		return len(close_ms)
+
+	def write_frame(self, df: Any, replace: bool = False) -> int:
+		"""Store a ``fetch_klines_df``-shaped frame (close_time index) plus feature columns."""
+		import numpy as np
+
+		close_ms = np.asarray(df.index.values).astype("datetime64[ms]").astype(np.int64)
+		return self.write(close_ms, df[self.columns].to_numpy(dtype=np.float64), replace=replace)
+
+	def close(self) -> None:
+		self._times = self._values = None
+		self._mm.close()
+		self._fh.close()
+
+
+class RingReader:
+	"""Lock-free reader of a ring written by ``RingWriter``.
+
+	Reads copy only the requested window, so a consumer's memory is bounded
+	by what it asks for, not by the feed's history. Plain Python reads
+	(``column``, ``klines``) need no third-party packages.
+	"""
+
+	def __init__(self, path: str | Path) -> None:
+		self.path = Path(path)
+		with open(self.path, "rb") as fh:
+			self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+		self.capacity, self.ncols, self.interval_ms, self.columns = _read_layout(self._mm)
+		view = memoryview(self._mm)
+		self._times = view[HEADER_SIZE : HEADER_SIZE + 8 * self.capacity].cast("q")
+		self._values = view[HEADER_SIZE + 8 * self.capacity : _file_size(self.capacity, self.ncols)].cast("d")
+
+	@property
+	def seq(self) -> int:
+		return _U64.unpack_from(self._mm, _SEQ_OFFSET)[0]
+
+	@property
+	def count(self) -> int:
+		return _U64.unpack_from(self._mm, _COUNT_OFFSET)[0]
+
+	@property
+	def updated_ms(self) -> int:
+		return _I64.unpack_from(self._mm, _UPDATED_OFFSET)[0]
+
+	def _consistent(self, n: int | None, copy):
+		for _ in range(_MAX_RETRIES):
+			seq = self.seq
+			if seq & 1:
+				time.sleep(0)
+				continue
+			count = self.count
+			size = min(count, self.capacity) if n is None else min(n, count, self.capacity)
+			start = (count - size) % self.capacity
+			if start + size <= self.capacity:
+				segments = [(start, start + size)]
+			else:
+				segments = [(start, self.capacity), (0, start + size - self.capacity)]
+			out = copy(segments)
+			if self.seq == seq:
+				return out, seq
+		raise RuntimeError(f"Could not get a consistent read of {self.path}")
+
+	def times(self, n: int | None = None) -> List[int]:
+		out, _ = self._consistent(n, lambda segs: [t for a, b in segs for t in self._times[a:b].tolist()])
+		return out
+
+	def column(self, name: str, n: int | None = None) -> List[float]:
+		"""Last ``n`` values of one column as a list, e.g. closes for ``last_ema_cross``."""
+		j, k = self.columns.index(name), self.ncols
+
+		def copy(segs):
+			return [v for a, b in segs for v in self._values[a * k + j : b * k : k].tolist()]
+
+		out, _ = self._consistent(n, copy)
+		return out
+
+	def klines(self, n: int | None = None) -> List[List[Any]]:
+		"""Last ``n`` bars in the ``get_klines`` row layout (prices as strings)."""
+		k = self.ncols
+		idx = [self.columns.index(c) for c in ("open", "high", "low", "close", "volume")]
+
+		def copy(segs):
+			rows = []
+			for a, b in segs:
+				times = self._times[a:b].tolist()
+				values = self._values[a * k : b * k].tolist()
+				for i, close_ms in enumerate(times):
+					row = values[i * k : (i + 1) * k]
+					rows.append(
+						[close_ms + 1 - self.interval_ms]
+						+ [str(row[j]) for j in idx]
+						+ [close_ms, "0", 0, "0", "0", "0"]
+					)
+			return rows
+
+		out, _ = self._consistent(n, copy)
+		return out
+
+	def frame(self, n: int | None = None) -> Any:
+		"""Last ``n`` bars as a DataFrame laid out like ``fetch_klines_df`` plus feature columns.
+
+		``attrs["version"]`` changes on every write, so ``compute_features``
+		can reuse cached indicators between refreshes.
+		"""
+		import numpy as np
+		import pandas as pd
+
+		times = np.frombuffer(self._mm, dtype=np.int64, count=self.capacity, offset=HEADER_SIZE)
+		values = np.frombuffer(
+			self._mm, dtype=np.float64, count=self.capacity * self.ncols, offset=HEADER_SIZE + 8 * self.capacity
+		).reshape(self.capacity, self.ncols)
+
+		def copy(segs):
+			return np.concatenate([times[a:b] for a, b in segs]), np.concatenate([values[a:b] for a, b in segs])
+
+		(close_ms, rows), seq = self._consistent(n, copy)
+		df = pd.DataFrame(rows, columns=self.columns, index=pd.to_datetime(close_ms, unit="ms"))
+		df.index.name = "close_time"
+		df.attrs["version"] = (str(self.path), seq)
+		return df
+
+	def age_seconds(self) -> float:
+		updated = self.updated_ms
+		return float("inf") if not updated else time.time() - updated / 1000.0
+
+	def serves(self, limit: int, max_age: float) -> bool:
+		"""True if the ring holds ``limit`` bars and was updated within ``max_age`` seconds."""
+		return min(self.count, self.capacity) >= limit and self.age_seconds() <= max_age
+
+	def close(self) -> None:
+		self._times.release()
+		self._values.release()
+		self._mm.close()
@@ -1,24 +1,49 @@
 import os
-from pydantic import BaseModel
-from dotenv import load_dotenv
+from dataclasses import dataclass, field
 
-load_dotenv()
 
+def _env(name: str, default: str | None = None):
+    return field(default_factory=lambda: os.getenv(name, default))
 
-class Settings(BaseModel):
-    binance_api_key: str | None = os.getenv("BINANCE_API_KEY")
-    binance_api_secret: str | None = os.getenv("BINANCE_API_SECRET")
+
+@dataclass
+class Settings:
+    binance_api_key: str | None = _env("BINANCE_API_KEY")
+    binance_api_secret: str | None = _env("BINANCE_API_SECRET")
 
     # True = use SPOT testnet for trading actions
-    use_testnet: bool = os.getenv("USE_TESTNET", "true").lower() in {"1", "true", "yes"}
+    use_testnet: bool = field(default_factory=lambda: os.getenv("USE_TESTNET", "true").lower() in {"1", "true", "yes"})
 
-    default_quote_asset: str = os.getenv("DEFAULT_QUOTE_ASSET", "USDT")
-    risk_fraction: float = float(os.getenv("RISK_FRACTION", "0.1"))
+    default_quote_asset: str = _env("DEFAULT_QUOTE_ASSET", "USDT")
+    risk_fraction: float = field(default_factory=lambda: float(os.getenv("RISK_FRACTION", "0.1")))
 
     # Backtest defaults
-    backtest_symbol: str = os.getenv("BACKTEST_SYMBOL", "BTCUSDT")
-    backtest_interval: str = os.getenv("BACKTEST_INTERVAL", "1h")
-    backtest_limit: int = int(os.getenv("BACKTEST_LIMIT", "500"))
+    backtest_symbol: str = _env("BACKTEST_SYMBOL", "BTCUSDT")
+    backtest_interval: str = _env("BACKTEST_INTERVAL", "1h")
+    backtest_limit: int = field(default_factory=lambda: int(os.getenv("BACKTEST_LIMIT", "500")))
+
+    # Local market-data bus (src/bus); unset = every process fetches its own klines
+    market_bus_dir: str | None = _env("MARKET_BUS_DIR")
+
+    # futures-paper / futures-live performance between runs; unset = not persisted
+    trader_state_dir: str | None = _env("TRADER_STATE_DIR")
+
+
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    # .env 只在第一次读取配置时加载，避免每次导入都付出开销
+    global _settings
+    if _settings is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _settings = Settings()
+    return _settings
 
 
-settings = Settings() 
\ No newline at end of file
+def __getattr__(name: str):
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
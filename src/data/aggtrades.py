@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple
+
+import numpy as np
+
+from src.data.archive_import import iter_csv_chunks, to_millis, verify_checksum
+
+# data.binance.vision aggTrades CSV：现货无表头且多一列 is_best_match，USDM 文件带表头
+AGGTRADES_COLUMNS = [
+    "agg_trade_id",
+    "price",
+    "quantity",
+    "first_trade_id",
+    "last_trade_id",
+    "transact_time",
+    "is_buyer_maker",
+    "is_best_match",
+]
+_USECOLS = [1, 2, 5, 6]
+_DTYPES = {"price": np.float64, "quantity": np.float64, "transact_time": np.int64, "is_buyer_maker": bool}
+
+# 逐笔二进制存储：定长记录，可直接 np.memmap，不需要整体载入内存
+TICK_DTYPE = np.dtype([("time", "<i8"), ("price", "<f8"), ("qty", "<f8"), ("buyer_maker", "?")])
+
+
+class TickChunk(NamedTuple):
+    time: np.ndarray  # int64 ms
+    price: np.ndarray  # float64
+    qty: np.ndarray  # float64
+    buyer_maker: np.ndarray  # bool, True = seller was the aggressor
+
+
+def iter_aggtrades_csv(archive: Path, chunksize: int = 1_000_000, verify: bool = False) -> Iterator[TickChunk]:
+    """Stream one aggTrades ZIP (or bare CSV), spot or USDM, in ``chunksize``-row chunks."""
+    if verify:
+        verify_checksum(archive)
+    columns = {i: AGGTRADES_COLUMNS[i] for i in _USECOLS}
+    for chunk in iter_csv_chunks(archive, columns, _DTYPES, chunksize):
+        yield TickChunk(
+            to_millis(chunk["transact_time"].to_numpy()),
+            chunk["price"].to_numpy(),
+            chunk["quantity"].to_numpy(),
+            chunk["is_buyer_maker"].to_numpy(),
+        )
+
+
+def find_aggtrades(root: Path, symbol: str | None = None) -> List[Path]:
+    """Archives under ``root`` named like ``BTCUSDT-aggTrades-2024-01(-15).zip``, oldest first."""
+    return sorted(Path(root).rglob(f"{symbol or '*'}-aggTrades-*.zip"))
+
+
+def write_tick_file(archives: Iterable[Path], out: Path, verify: bool = True, chunksize: int = 1_000_000) -> int:
+    """Convert archives into one ``TICK_DTYPE`` file; returns the number of ticks written."""
+    total = 0
+    with open(out, "wb") as fh:
+        for archive in archives:
+            if verify:
+                verify_checksum(archive)
+            for chunk in iter_aggtrades_csv(archive, chunksize=chunksize):
+                rec = np.empty(len(chunk.time), dtype=TICK_DTYPE)
+                rec["time"], rec["price"], rec["qty"], rec["buyer_maker"] = chunk
+                rec.tofile(fh)
+                total += len(rec)
+    return total
+
+
+def iter_tick_file(path: Path, chunksize: int = 1_000_000) -> Iterator[TickChunk]:
+    """Memory-map a tick file and yield it in chunks; only touched pages are read."""
+    ticks = np.memmap(path, dtype=TICK_DTYPE, mode="r")
+    for start in range(0, len(ticks), chunksize):
+        part = ticks[start : start + chunksize]
+        # 结构化记录按字段拷出为连续数组，便于向量化计算
+        yield TickChunk(
+            np.ascontiguousarray(part["time"]),
+            np.ascontiguousarray(part["price"]),
+            np.ascontiguousarray(part["qty"]),
+            np.ascontiguousarray(part["buyer_maker"]),
+        )
+
+
+def iter_ticks(paths: Iterable[Path], chunksize: int = 1_000_000, verify: bool = False) -> Iterator[TickChunk]:
+    """Chunks from tick files (``.bin``) and/or aggTrades archives, in the given order."""
+    for path in paths:
+        path = Path(path)
+        if path.suffix.lower() == ".bin":
+            yield from iter_tick_file(path, chunksize)
+        else:
+            yield from iter_aggtrades_csv(path, chunksize, verify=verify)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import hashlib
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.resample import INTERVAL_MS
+
+# data.binance.vision 的 K 线 CSV 列顺序（现货与 USDM 相同，USDM 文件带表头）
+ARCHIVE_COLUMNS = [
+    "open_time",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base",
+    "taker_buy_quote",
+    "ignore",
+]
+OHLCV = ["open", "high", "low", "close", "volume"]
+_USECOLS = [1, 2, 3, 4, 5, 6]
+_DTYPES = {**{c: np.float64 for c in OHLCV}, "close_time": np.int64}
+# data.binance.vision 发布的K线周期（文件名第二段）
+KLINE_INTERVALS = set(INTERVAL_MS) | {"1s", "3d", "1w", "1mo"}
+_READ_BLOCK = 1 << 20
+# 2025 年起现货归档使用微秒时间戳；毫秒时间戳在可预见的未来都小于该值
+_MICROS_THRESHOLD = 10**14
+# 流式导出的中间分片：定长二进制记录，合并时按块 memmap 读取
+_PART_DTYPE = np.dtype([("close_time", "<i8")] + [(c, "<f8") for c in OHLCV])
+
+
+def verify_checksum(archive: Path, checksum_file: Path | None = None) -> None:
+    """Compare the archive's SHA-256 with its ``.CHECKSUM`` sidecar."""
+    archive = Path(archive)
+    checksum_file = Path(checksum_file or f"{archive}.CHECKSUM")
+    expected = checksum_file.read_text().split()[0].strip().lower()
+    digest = hashlib.sha256()
+    with archive.open("rb") as fh:
+        for block in iter(lambda: fh.read(_READ_BLOCK), b""):
+            digest.update(block)
+    if digest.hexdigest() != expected:
+        raise ValueError(f"Checksum mismatch for {archive.name}: {digest.hexdigest()} != {expected}")
+
+
+def iter_csv_chunks(
+    archive: Path,
+    columns: Mapping[int, str],
+    dtype: Mapping[str, Any],
+    chunksize: int = 200_000,
+) -> Iterator[pd.DataFrame]:
+    """Stream the CSV inside a data.binance.vision ZIP (or a bare CSV) in chunks.
+
+    ``columns`` maps field positions to names, so layouts that only differ by
+    trailing fields (spot vs USDM) parse alike; a header row, present in USDM
+    files only, is detected and skipped.
+    """
+    archive = Path(archive)
+    if archive.suffix.lower() == ".zip":
+        with zipfile.ZipFile(archive) as zf:
+            member = next(n for n in zf.namelist() if n.lower().endswith(".csv"))
+            with zf.open(member) as raw:
+                header = _has_header(raw)
+            with zf.open(member) as raw:
+                yield from _read_chunks(raw, header, columns, dtype, chunksize)
+    else:
+        with archive.open("rb") as raw:
+            header = _has_header(raw)
+        with archive.open("rb") as raw:
+            yield from _read_chunks(raw, header, columns, dtype, chunksize)
+
+
+def _has_header(raw: IO[bytes]) -> bool:
+    return not raw.read(1).isdigit()
+
+
+def _read_chunks(
+    raw: IO[bytes], header: bool, columns: Mapping[int, str], dtype: Mapping[str, Any], chunksize: int
+) -> Iterator[pd.DataFrame]:
+    reader = pd.read_csv(
+        raw,
+        header=None,
+        skiprows=1 if header else 0,
+        usecols=list(columns),
+        dtype={i: dtype[name] for i, name in columns.items() if name in dtype},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        yield chunk.rename(columns=dict(columns))
+
+
+def to_millis(times: np.ndarray) -> np.ndarray:
+    """Epoch timestamps in ms; spot archives switched to microseconds in 2025."""
+    if len(times) and times[0] >= _MICROS_THRESHOLD:
+        return times // 1000
+    return times
+
+
+def iter_archive_chunks(archive: Path, chunksize: int = 200_000) -> Iterator[pd.DataFrame]:
+    """Stream one kline ZIP (or bare CSV) as ``fetch_klines_df``-shaped chunks.
+
+    Rows are decompressed and parsed ``chunksize`` at a time, so memory stays
+    bounded regardless of archive size.
+    """
+    columns = {i: ARCHIVE_COLUMNS[i] for i in _USECOLS}
+    for chunk in iter_csv_chunks(archive, columns, _DTYPES, chunksize):
+        out = chunk[OHLCV]
+        out.index = pd.to_datetime(to_millis(chunk["close_time"].to_numpy()), unit="ms")
+        out.index.name = "close_time"
+        yield out
+
+
+def read_archive(archive: Path, verify: bool = True, chunksize: int = 200_000) -> pd.DataFrame:
+    archive = Path(archive)
+    if verify:
+        verify_checksum(archive)
+    chunks = list(iter_archive_chunks(archive, chunksize=chunksize))
+    if not chunks:
+        return pd.DataFrame(columns=OHLCV, dtype=float)
+    return pd.concat(chunks)
+
+
+def find_archives(root: Path, symbol: str | None = None, interval: str | None = None) -> List[Path]:
+    """Kline archives under ``root`` named like ``BTCUSDT-1m-2024-01(-15).zip``.
+
+    Other dumps kept alongside (``-aggTrades-``, ``-trades-``) are skipped.
+    """
+    pattern = f"{symbol or '*'}-{interval or '*'}-*.zip"
+    return sorted(p for p in Path(root).rglob(pattern) if p.name.split("-")[1] in KLINE_INTERVALS)
+
+
+def import_archives(
+    archives: Iterable[Path],
+    workers: int = 4,
+    verify: bool = True,
+    chunksize: int = 200_000,
+) -> pd.DataFrame:
+    """Verify and parse many archives in a process pool into one frame.
+
+    Monthly and daily archives may overlap; duplicates keep the last copy.
+    The whole history is held in memory; ``export_archives`` streams to disk.
+    """
+    archives = [Path(a) for a in archives]
+    if not archives:
+        return pd.DataFrame(columns=OHLCV, dtype=float)
+    if workers <= 1 or len(archives) == 1:
+        frames = [read_archive(a, verify, chunksize) for a in archives]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(read_archive, archives, [verify] * len(archives), [chunksize] * len(archives)))
+    df = pd.concat([f for f in frames if not f.empty] or frames)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df
+
+
+# ---------- Streaming export ----------
+def _write_part(archive: Path, part: Path, verify: bool, chunksize: int) -> Tuple[Path, int, Optional[int]]:
+    """Parse one archive chunk by chunk into a part file; returns (part, rows, first close ms)."""
+    if verify:
+        verify_checksum(archive)
+    rows, first = 0, None
+    with open(part, "wb") as fh:
+        for chunk in iter_archive_chunks(archive, chunksize=chunksize):
+            rec = np.empty(len(chunk), dtype=_PART_DTYPE)
+            rec["close_time"] = chunk.index.values.astype("datetime64[ms]").astype(np.int64)
+            for c in OHLCV:
+                rec[c] = chunk[c].to_numpy()
+            if first is None and len(rec):
+                first = int(rec["close_time"][0])
+            rec.tofile(fh)
+            rows += len(rec)
+    return part, rows, first
+
+
+def export_archives(
+    archives: Iterable[Path],
+    out: Path | None,
+    workers: int = 4,
+    verify: bool = True,
+    chunksize: int = 200_000,
+) -> Dict[str, object]:
+    """Verify and parse many archives into one CSV without loading them whole.
+
+    Each worker streams its archive into a part file; the parts are then
+    appended to ``out`` (``None`` only counts) ``chunksize`` rows at a time,
+    oldest archive first. Rows already covered by an earlier archive, as with
+    overlapping monthly and daily files, are skipped. Memory stays bounded by
+    ``chunksize`` per process, whatever the total history.
+    """
+    archives = [Path(a) for a in archives]
+    summary: Dict[str, object] = {"archives": len(archives), "bars": 0, "start": None, "end": None}
+    with tempfile.TemporaryDirectory(prefix="kline-parts-", dir=Path(out).parent if out else None) as tmp:
+        parts = [Path(tmp) / f"{i:05d}.bin" for i in range(len(archives))]
+        args = (archives, parts, [verify] * len(archives), [chunksize] * len(archives))
+        if workers <= 1 or len(archives) <= 1:
+            done = list(map(_write_part, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                done = list(pool.map(_write_part, *args))
+
+        last: Optional[int] = None
+        fh = open(out, "w", newline="") if out else None
+        try:
+            for part, _rows, first in sorted((d for d in done if d[2] is not None), key=lambda d: d[2]):
+                records = np.memmap(part, dtype=_PART_DTYPE, mode="r")
+                for start in range(0, len(records), chunksize):
+                    rec = records[start : start + chunksize]
+                    if last is not None:
+                        rec = rec[rec["close_time"] > last]
+                    if not len(rec):
+                        continue
+                    if summary["start"] is None:
+                        summary["start"] = pd.to_datetime(int(rec["close_time"][0]), unit="ms")
+                    last = int(rec["close_time"][-1])
+                    summary["bars"] += len(rec)
+                    if fh is not None:
+                        chunk = pd.DataFrame({c: rec[c] for c in OHLCV}, index=pd.to_datetime(rec["close_time"], unit="ms"))
+                        chunk.index.name = "close_time"
+                        chunk.to_csv(fh, header=fh.tell() == 0)
+                del records
+        finally:
+            if fh is not None:
+                fh.close()
+    if last is not None:
+        summary["end"] = pd.to_datetime(last, unit="ms")
+    return summary
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# 每根蜡烛至少占用的像素数；折线每像素保留一个点即可保持视觉形状
+CANDLE_PX = 4
+LINE_POINTS_PER_PX = 1
+
+
+def candle_budget(width_px: int) -> int:
+    return max(1, int(width_px) // CANDLE_PX)
+
+
+def line_budget(width_px: int) -> int:
+    return max(3, int(width_px) * LINE_POINTS_PER_PX)
+
+
+def downsample_ohlcv(df: pd.DataFrame, max_bars: int) -> pd.DataFrame:
+    """Merge consecutive bars into at most ``max_bars`` buckets.
+
+    Each bucket keeps the first open, the highest high, the lowest low, the
+    last close and the summed volume, so wicks and totals survive reduction.
+    The bucket is labelled with the index of its last bar (the close time).
+    """
+    n = len(df)
+    if max_bars <= 0 or n <= max_bars:
+        return df
+
+    starts = np.unique(np.linspace(0, n, max_bars + 1).astype(np.int64)[:-1])
+    ends = np.append(starts[1:], n) - 1
+
+    out = pd.DataFrame(
+        {
+            "open": df["open"].to_numpy()[starts],
+            "high": np.maximum.reduceat(df["high"].to_numpy(), starts),
+            "low": np.minimum.reduceat(df["low"].to_numpy(), starts),
+            "close": df["close"].to_numpy()[ends],
+        },
+        index=df.index[ends],
+    )
+    if "volume" in df.columns:
+        out["volume"] = np.add.reduceat(df["volume"].to_numpy(), starts)
+    return out
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: positions of the points to keep."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # 首尾点固定保留，中间 n-2 个点分成 threshold-2 个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+            avg_x = x[nlo:nhi].mean()
+            avg_y = y[nlo:nhi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_series(s: pd.Series, max_points: int) -> pd.Series:
+    s = s.dropna()
+    if len(s) <= max_points:
+        return s
+    if isinstance(s.index, pd.DatetimeIndex):
+        x = s.index.asi8.astype(float)
+    else:
+        x = np.arange(len(s), dtype=float)
+    idx = lttb_indices(x, s.to_numpy(dtype=float), max_points)
+    return s.iloc[idx]
+
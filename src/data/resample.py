@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+_MINUTE_MS = 60_000
+
+INTERVAL_MS: Dict[str, int] = {
+    "1m": _MINUTE_MS,
+    "3m": 3 * _MINUTE_MS,
+    "5m": 5 * _MINUTE_MS,
+    "15m": 15 * _MINUTE_MS,
+    "30m": 30 * _MINUTE_MS,
+    "1h": 60 * _MINUTE_MS,
+    "2h": 120 * _MINUTE_MS,
+    "4h": 240 * _MINUTE_MS,
+    "6h": 360 * _MINUTE_MS,
+    "8h": 480 * _MINUTE_MS,
+    "12h": 720 * _MINUTE_MS,
+    "1d": 1440 * _MINUTE_MS,
+}
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+
+def _close_ms(index: pd.Index) -> np.ndarray:
+    return np.asarray(index.values).astype("datetime64[ms]").astype(np.int64)
+
+
+def _aggregate(open_ms: np.ndarray, values: Dict[str, np.ndarray], interval_ms: int) -> pd.DataFrame:
+    # Binance 的 1d 及以下周期都按 UTC 纪元整倍数对齐
+    bucket = open_ms - open_ms % interval_ms
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)] - 1
+    close_time = pd.to_datetime(bucket[starts] + interval_ms - 1, unit="ms")
+    out = pd.DataFrame(
+        {
+            "open": values["open"][starts],
+            "high": np.maximum.reduceat(values["high"], starts),
+            "low": np.minimum.reduceat(values["low"], starts),
+            "close": values["close"][ends],
+            "volume": np.add.reduceat(values["volume"], starts),
+        },
+        index=close_time,
+    )
+    out.index.name = "close_time"
+    return out
+
+
+def resample_klines(df_1m: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Build ``interval`` bars from 1m bars laid out like ``fetch_klines_df``.
+
+    The input is indexed by close time; the output uses the same layout, with
+    the last bucket left partial when its 1m bars have not all arrived yet.
+    """
+    interval_ms = INTERVAL_MS[interval]
+    if df_1m.empty:
+        return df_1m[OHLCV].copy()
+    open_ms = _close_ms(df_1m.index) + 1 - _MINUTE_MS
+    values = {col: df_1m[col].to_numpy(dtype=float) for col in OHLCV}
+    return _aggregate(open_ms, values, interval_ms)
+
+
+def resample_many(df_1m: pd.DataFrame, intervals: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    return {iv: df_1m[OHLCV] if iv == "1m" else resample_klines(df_1m, iv) for iv in intervals}
+
+
+class KlineResampler:
+    """Keep several intervals up to date from a stream of 1m bars.
+
+    Only the 1m bars of each interval's still-open bucket are buffered, so an
+    ``update`` costs O(new bars + one bucket) regardless of history length.
+    Re-sending the latest (unclosed) 1m bar replaces it.
+    """
+
+    def __init__(self, intervals: Iterable[str]) -> None:
+        self.intervals = list(intervals)
+        for iv in self.intervals:
+            if iv not in INTERVAL_MS:
+                raise ValueError(f"Unsupported interval: {iv}")
+        self._buffer = pd.DataFrame(columns=OHLCV, dtype=float)
+        self._closed: Dict[str, list] = {iv: [] for iv in self.intervals}
+        self._tail: Dict[str, pd.DataFrame] = {}
+        self._tail_open_ms: Dict[str, int] = {}
+        self._cache: Dict[str, pd.DataFrame] = {}
+
+    def update(self, df_1m: pd.DataFrame) -> None:
+        if df_1m.empty:
+            return
+        df_1m = df_1m[OHLCV]
+        if not self._buffer.empty:
+            df_1m = df_1m[df_1m.index >= self._buffer.index[-1]]
+            if df_1m.empty:
+                return
+            old = self._buffer[self._buffer.index < df_1m.index[0]]
+            df_1m = pd.concat([old, df_1m]) if not old.empty else df_1m
+        buffer = df_1m
+
+        buffer_ms = _close_ms(buffer.index) + 1 - _MINUTE_MS
+        for iv in self.intervals:
+            start = self._tail_open_ms.get(iv)
+            part = buffer if start is None else buffer[buffer_ms >= start]
+            bars = resample_klines(part, iv)
+            if len(bars) > 1:
+                self._closed[iv].append(bars.iloc[:-1])
+            self._tail[iv] = bars.iloc[-1:]
+            self._tail_open_ms[iv] = int(_close_ms(bars.index[-1:])[0]) + 1 - INTERVAL_MS[iv]
+
+        keep_from = min(self._tail_open_ms.values())
+        self._buffer = buffer[buffer_ms >= keep_from]
+        self._cache.clear()
+
+    def frame(self, interval: str) -> pd.DataFrame:
+        if interval not in self._cache:
+            chunks = self._closed[interval] + ([self._tail[interval]] if interval in self._tail else [])
+            if not chunks:
+                return pd.DataFrame(columns=OHLCV, dtype=float)
+            merged = pd.concat(chunks)
+            # 合并已收盘的块，避免块列表随更新次数无限增长
+            self._closed[interval] = [merged.iloc[:-1]]
+            self._cache[interval] = merged
+        return self._cache[interval]
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_DOWN
+from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
 from binance.spot import Spot as SpotClient
 
+from src.exchange.instrument import round_to_step
+
 
 MAINNET_BASE_URL = "https://api.binance.com"
 ALT_PUBLIC_URLS = [
@@ -38,7 +40,7 @@ class BinanceSpotClient:
 		self.public_urls: List[str] = [configured_public] + [u for u in ALT_PUBLIC_URLS if u != configured_public]
 
 		# Private client for account/orders. Defaults to SPOT testnet for safety.
-		private_base_url = TESTNET_BASE_URL if use_testnet else MAINNET_BASE_URL
+		private_base_url = os.getenv("BINANCE_PRIVATE_BASE_URL") or (TESTNET_BASE_URL if use_testnet else MAINNET_BASE_URL)
 		if api_key and api_secret:
 			self.private = SpotClient(
 				api_key=api_key,
@@ -87,13 +89,7 @@ class BinanceSpotClient:
 		)
 
 	# ---------- Rounding helpers ----------
-	@staticmethod
-	def round_to_step(value: Decimal, step: Decimal) -> Decimal:
-		if step == 0:
-			return value
-		precision = max(0, -step.as_tuple().exponent)
-		quantized = (value // step) * step
-		return quantized.quantize(Decimal(10) ** -precision, rounding=ROUND_DOWN)
+	round_to_step = staticmethod(round_to_step)
 
 	# ---------- Trading ----------
 	def place_market_order(
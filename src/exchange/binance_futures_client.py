@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_DOWN
+from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
 import requests
@@ -11,6 +11,8 @@ import hmac
 import hashlib
 import random
 
+from src.exchange.instrument import round_to_step
+
 FAPI_MAIN = "https://fapi.binance.com"
 FAPI_TESTNET = "https://testnet.binancefuture.com"
 FAPI_ALTS = [
@@ -26,6 +28,7 @@ class FuturesSymbolFilters:
 	lot_step_size: Decimal
 	lot_min_qty: Decimal
 	price_tick_size: Decimal
+	min_notional: Optional[Decimal] = None
 
 
 class BinanceUSDMClient:
@@ -41,7 +44,8 @@ class BinanceUSDMClient:
 		self.api_key = api_key or ""
 		self.api_secret = api_secret or ""
 		self.use_testnet = use_testnet
-		self.private_base = FAPI_TESTNET if use_testnet else FAPI_MAIN
+		# 私有接口可指向本地模拟交易所（src/sim）
+		self.private_base = os.getenv("BINANCE_FAPI_PRIVATE_BASE_URL") or (FAPI_TESTNET if use_testnet else FAPI_MAIN)
 
 	def _public_get(self, url: str, params: Dict[str, Any] | None = None) -> Any:
 		last_exc: Optional[Exception] = None
@@ -74,7 +78,10 @@ class BinanceUSDMClient:
 		qs_signed = f"{qs}&signature={signature}"
 		url = f"{self.private_base}{path}"
 		headers = {"X-MBX-APIKEY": self.api_key}
-		resp = requests.request(method.upper(), url, params=None, data=qs_signed, headers=headers, timeout=15)
+		if method.upper() == "GET":
+			resp = requests.get(f"{url}?{qs_signed}", headers=headers, timeout=15)
+		else:
+			resp = requests.request(method.upper(), url, params=None, data=qs_signed, headers=headers, timeout=15)
 		resp.raise_for_status()
 		return resp.json()
 
@@ -97,30 +104,32 @@ class BinanceUSDMClient:
 	def get_exchange_info(self) -> Dict[str, Any]:
 		return self._with_public_fallback("/fapi/v1/exchangeInfo")
 
+	def get_server_time(self) -> int:
+		return int(self._with_public_fallback("/fapi/v1/time")["serverTime"])
+
 	def get_symbol_filters(self, symbol: str) -> FuturesSymbolFilters:
 		info = self.get_exchange_info()
 		s = next(x for x in info["symbols"] if x["symbol"] == symbol)
 		lot = next(f for f in s["filters"] if f["filterType"] == "LOT_SIZE")
 		price = next(f for f in s["filters"] if f["filterType"] == "PRICE_FILTER")
+		notional = next((f for f in s["filters"] if f["filterType"] == "MIN_NOTIONAL"), None)
 		return FuturesSymbolFilters(
 			lot_step_size=Decimal(lot["stepSize"]),
 			lot_min_qty=Decimal(lot["minQty"]),
 			price_tick_size=Decimal(price["tickSize"]),
+			min_notional=Decimal(notional["notional"]) if notional else None,
 		)
 
 	# -------- Helpers --------
-	@staticmethod
-	def round_to_step(value: Decimal, step: Decimal) -> Decimal:
-		if step == 0:
-			return value
-		precision = max(0, -step.as_tuple().exponent)
-		quantized = (value // step) * step
-		return quantized.quantize(Decimal(10) ** -precision, rounding=ROUND_DOWN)
+	round_to_step = staticmethod(round_to_step)
 
 	# -------- Trading (private) --------
 	def change_leverage(self, symbol: str, leverage: int) -> Dict[str, Any]:
 		return self._signed_request("POST", "/fapi/v1/leverage", {"symbol": symbol, "leverage": leverage})
 
+	def get_account(self) -> Dict[str, Any]:
+		return self._signed_request("GET", "/fapi/v2/account", {})
+
 	def new_market_order(
 		self,
 		symbol: str,
@@ -134,6 +143,8 @@ class BinanceUSDMClient:
 			"side": side.upper(),
 			"type": "MARKET",
 			"quantity": str(quantity),
+			# 默认 ACK 响应里没有成交均价与成交量
+			"newOrderRespType": "RESULT",
 		}
 		if reduce_only:
 			params["reduceOnly"] = "true"
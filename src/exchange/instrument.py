@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_DOWN
+from typing import Any, List, Optional, Tuple
+
+# 向量化路径先用浮点估算，距离步长边界过近的元素再逐个走精确路径
+_BOUNDARY_EPS = 1e-9
+
+
+def round_to_step(value: Decimal, step: Decimal) -> Decimal:
+	"""Reference Decimal rounding (truncate toward zero to a multiple of ``step``)."""
+	if step == 0:
+		return value
+	precision = max(0, -step.as_tuple().exponent)
+	quantized = (value // step) * step
+	return quantized.quantize(Decimal(10) ** -precision, rounding=ROUND_DOWN)
+
+
+def _grid(step: Decimal) -> Tuple[int, int]:
+	"""(decimals, step in units of 10**-decimals) for a filter step."""
+	decimals = max(0, -step.as_tuple().exponent)
+	return decimals, int(step.scaleb(decimals))
+
+
+def _units(value: Decimal, decimals: int) -> int:
+	return int(value.scaleb(decimals))  # int() truncates toward zero, like Decimal //
+
+
+def _from_units(units: int, decimals: int, negative: bool = False) -> Decimal:
+	if negative:
+		return Decimal((1, (0,), -decimals)) if units == 0 else Decimal(-units).scaleb(-decimals)
+	return Decimal(units).scaleb(-decimals)
+
+
+@dataclass(frozen=True)
+class Instrument:
+	"""Symbol filters pre-scaled to integers.
+
+	Quantities live on a grid of ``10**-qty_decimals`` and prices on
+	``10**-price_decimals``; ``step``, ``min_qty`` and ``tick`` are integer
+	counts of those units. All Decimal results are identical, digit for digit
+	and exponent for exponent, to ``round_to_step`` on the same inputs.
+	"""
+
+	symbol: str
+	qty_decimals: int
+	step: int
+	min_qty: int
+	price_decimals: int
+	tick: int
+	min_notional: Optional[Decimal]
+
+	@classmethod
+	def from_filters(cls, symbol: str, filters: Any) -> "Instrument":
+		"""Build from ``SymbolFilters`` or ``FuturesSymbolFilters``."""
+		qty_decimals, step = _grid(filters.lot_step_size)
+		price_decimals, tick = _grid(filters.price_tick_size)
+		return cls(
+			symbol=symbol,
+			qty_decimals=qty_decimals,
+			step=step,
+			min_qty=_units(filters.lot_min_qty, qty_decimals),
+			price_decimals=price_decimals,
+			tick=tick,
+			min_notional=getattr(filters, "min_notional", None),
+		)
+
+	@property
+	def min_quantity(self) -> Decimal:
+		return _from_units(self.min_qty, self.qty_decimals)
+
+	# -------- Scalar --------
+	def _round(self, value: Decimal, decimals: int, step: int) -> Decimal:
+		if step == 0:
+			return value
+		units = abs(_units(value, decimals))
+		return _from_units(units - units % step, decimals, value.is_signed())
+
+	def round_qty(self, value: Decimal) -> Decimal:
+		return self._round(value, self.qty_decimals, self.step)
+
+	def round_price(self, value: Decimal) -> Decimal:
+		return self._round(value, self.price_decimals, self.tick)
+
+	def size(self, quote: Decimal, price: Decimal, leverage: int | Decimal = 1) -> Decimal:
+		"""Base quantity for ``quote`` margin at ``leverage``, rounded down to the lot step."""
+		return self.round_qty(quote * Decimal(leverage) / price)
+
+	def check(self, qty: Decimal, price: Decimal) -> Optional[str]:
+		"""Reason the order would be rejected by LOT_SIZE / MIN_NOTIONAL, else ``None``."""
+		units = _units(qty, self.qty_decimals)
+		if units <= 0:
+			return "quantity is zero after rounding"
+		if units < self.min_qty:
+			return f"quantity {qty} below minQty {self.min_quantity}"
+		if self.min_notional is not None and qty * price < self.min_notional:
+			return f"notional {qty * price} below minNotional {self.min_notional}"
+		return None
+
+	def qty_str(self, units: int) -> str:
+		return str(_from_units(units, self.qty_decimals))
+
+	# -------- Vectorized --------
+	def size_orders(self, quote: Any, price: Any, leverage: Any = 1) -> Any:
+		"""Vectorized ``size`` over a basket; returns quantities as int64 qty units.
+
+		Each element equals ``size(Decimal(str(q)), Decimal(str(p)), lev)``.
+		Floats are used where they cannot change the result; elements within
+		float error of a step boundary are recomputed on the exact path.
+		"""
+		import numpy as np
+
+		quote, price, leverage = np.broadcast_arrays(
+			np.asarray(quote, dtype=float), np.asarray(price, dtype=float), np.asarray(leverage, dtype=float)
+		)
+		steps = quote * leverage / price * (10.0**self.qty_decimals / self.step)
+		units = np.floor(steps)
+		frac = steps - units
+		exact = (frac < _BOUNDARY_EPS * np.maximum(steps, 1.0)) | (1.0 - frac < _BOUNDARY_EPS * np.maximum(steps, 1.0))
+		units = units.astype(np.int64) * self.step
+		for i in zip(*np.nonzero(exact)):
+			qty = self.size(Decimal(str(quote[i])), Decimal(str(price[i])), Decimal(str(leverage[i])))
+			units[i] = _units(qty, self.qty_decimals)
+		return units
+
+	def check_orders(self, units: Any, price: Any) -> Any:
+		"""Boolean mask of orders that pass minQty and minNotional (``check`` is None)."""
+		import numpy as np
+
+		units, price = np.broadcast_arrays(np.asarray(units, dtype=np.int64), np.asarray(price, dtype=float))
+		ok = (units > 0) & (units >= self.min_qty)
+		if self.min_notional is None:
+			return ok
+		limit = float(self.min_notional)
+		notional = units * (10.0**-self.qty_decimals) * price
+		close = np.abs(notional - limit) <= _BOUNDARY_EPS * max(limit, 1.0)
+		ok &= (notional >= limit) | close
+		for i in zip(*np.nonzero(ok & close)):
+			qty = _from_units(int(units[i]), self.qty_decimals)
+			ok[i] = qty * Decimal(str(price[i])) >= self.min_notional
+		return ok
+
+	def qty_strs(self, units: Any) -> List[str]:
+		return [self.qty_str(int(u)) for u in units]
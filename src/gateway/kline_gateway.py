@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from src.exchange.binance_client import ALT_PUBLIC_URLS, MAINNET_BASE_URL
+from src.exchange.binance_futures_client import FAPI_ALTS, FAPI_MAIN
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+DEFAULT_LIMIT = 500
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class UpstreamRejected(Exception):
+	"""Upstream answered 4xx (bad symbol, interval, rate limit): forwarded as is."""
+
+	def __init__(self, status: int, body: bytes) -> None:
+		super().__init__(f"upstream returned {status}")
+		self.status = status
+		self.body = body
+
+
+@dataclass
+class _CacheEntry:
+	body: bytes
+	expires_at: float
+
+
+class KlineGateway:
+	"""Binance-compatible kline endpoint with request coalescing and a short cache.
+
+	Identical concurrent requests share one upstream call, failing over across
+	hosts on transport errors and 5xx; a 4xx is returned to the client
+	unchanged, without retry. Responses are cached
+	for ``ttl`` seconds, but never past the close of the last (still forming)
+	bar. Only requests for an explicit window (``endTime``, or a full
+	``startTime``/``limit`` page) that closed more than ``skew`` seconds ago
+	are kept for ``closed_ttl``.
+	"""
+
+	def __init__(
+		self,
+		fapi_urls: Optional[List[str]] = None,
+		spot_urls: Optional[List[str]] = None,
+		ttl: float = 3.0,
+		closed_ttl: float = 3600.0,
+		skew: float = 5.0,
+		max_entries: int = 2048,
+		max_upstream: int = 8,
+		clock: Callable[[], float] = time.time,
+		timeout: float = 7.0,
+	) -> None:
+		# 上游域名不读取 BINANCE_*_BASE_URL，避免客户端指向网关时形成回环
+		self.fapi_urls = list(fapi_urls or [FAPI_MAIN] + FAPI_ALTS)
+		self.spot_urls = list(spot_urls or [MAINNET_BASE_URL] + ALT_PUBLIC_URLS)
+		self.timeout = timeout
+		self.ttl = ttl
+		self.closed_ttl = closed_ttl
+		self.skew = skew
+		self.max_entries = max_entries
+		self.clock = clock
+		self.upstream_calls = 0
+		self._cache: Dict[CacheKey, _CacheEntry] = {}
+		self._inflight: Dict[CacheKey, asyncio.Future] = {}
+		# 独立线程池：上游请求为阻塞 IO，不与事件循环默认执行器争用
+		self._executor = ThreadPoolExecutor(max_workers=max_upstream, thread_name_prefix="kline-upstream")
+
+	# -------- Upstream --------
+	def _fetch_upstream(self, path: str, params: Dict[str, str]) -> Any:
+		urls = self.spot_urls if path == "/api/v3/klines" else self.fapi_urls
+		last_exc: Optional[Exception] = None
+		for base in urls:
+			try:
+				resp = requests.get(f"{base}{path}", params=params, timeout=self.timeout)
+			except requests.RequestException as exc:
+				last_exc = exc
+				continue
+			if 400 <= resp.status_code < 500:
+				# 参数错误/限频换域名也一样，直接交给客户端处理
+				raise UpstreamRejected(resp.status_code, resp.content)
+			if resp.status_code >= 500:
+				last_exc = RuntimeError(f"{base}{path} returned {resp.status_code}")
+				continue
+			return resp.json()
+		if last_exc:
+			raise last_exc
+		raise RuntimeError("kline upstreams unreachable")
+
+	def _expires_at(self, params: Dict[str, str], rows: Any) -> float:
+		now = self.clock()
+		if not rows:
+			return now + self.ttl
+		last_close = int(rows[-1][6]) / 1000.0
+		if last_close < now - self.skew and self._window_closed(params, rows, now):
+			return now + self.closed_ttl
+		if last_close <= now:
+			return now + self.ttl
+		return now + min(self.ttl, last_close - now)
+
+	def _window_closed(self, params: Dict[str, str], rows: Any, now: float) -> bool:
+		# 只有显式时间窗口且已整体落在过去时才长缓存；"最新 N 根" 请求随时会有新K线
+		if params.get("endTime"):
+			return int(params["endTime"]) / 1000.0 < now - self.skew
+		if params.get("startTime"):
+			return len(rows) >= int(params.get("limit") or DEFAULT_LIMIT)
+		return False
+
+	def _store(self, key: CacheKey, body: bytes, expires_at: float) -> None:
+		if len(self._cache) >= self.max_entries:
+			now = self.clock()
+			for k in [k for k, e in self._cache.items() if e.expires_at <= now]:
+				del self._cache[k]
+			if len(self._cache) >= self.max_entries:
+				self._cache.pop(next(iter(self._cache)))
+		self._cache[key] = _CacheEntry(body=body, expires_at=expires_at)
+
+	async def get_klines(self, path: str, params: Dict[str, str]) -> bytes:
+		key: CacheKey = (path, tuple(sorted(params.items())))
+		entry = self._cache.get(key)
+		if entry is not None and entry.expires_at > self.clock():
+			return entry.body
+
+		pending = self._inflight.get(key)
+		if pending is not None:
+			return await asyncio.shield(pending)
+
+		fut: asyncio.Future = asyncio.get_running_loop().create_future()
+		self._inflight[key] = fut
+		try:
+			self.upstream_calls += 1
+			loop = asyncio.get_running_loop()
+			rows = await loop.run_in_executor(self._executor, self._fetch_upstream, path, params)
+			body = json.dumps(rows, separators=(",", ":")).encode()
+			self._store(key, body, self._expires_at(params, rows))
+			fut.set_result(body)
+			return body
+		except Exception as exc:  # noqa: BLE001 - forwarded to coalesced waiters
+			fut.set_exception(exc)
+			# 已由本协程抛出，避免 "exception was never retrieved" 警告
+			fut.exception()
+			raise
+		finally:
+			if not fut.done():
+				fut.cancel()
+			del self._inflight[key]
+
+	# -------- HTTP --------
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		try:
+			head = await reader.readuntil(b"\r\n\r\n")
+			method, target, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+			status, body = await self._route(method.upper(), target)
+		except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+			status, body = 400, _error(-1100, "Malformed request.")
+		headers = [
+			f"HTTP/1.1 {status} {_reason(status)}",
+			"Content-Type: application/json; charset=utf-8",
+			f"Content-Length: {len(body)}",
+			"Access-Control-Allow-Origin: *",
+			"Access-Control-Allow-Methods: GET, OPTIONS",
+			"Access-Control-Allow-Headers: *",
+			"Connection: close",
+		]
+		writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+		try:
+			await writer.drain()
+		finally:
+			writer.close()
+
+	async def _route(self, method: str, target: str) -> Tuple[int, bytes]:
+		url = urlsplit(target)
+		path = url.path
+		if path == "/klines":
+			# 与 functions/klines.ts 一致的短路径，供前端使用
+			path = "/fapi/v1/klines"
+		if path not in {"/fapi/v1/klines", "/api/v3/klines"}:
+			return 404, _error(-1000, f"Unsupported path {url.path}")
+		if method == "OPTIONS":
+			return 204, b""
+		if method != "GET":
+			return 405, _error(-1000, f"Unsupported method {method}")
+
+		params = dict(parse_qsl(url.query))
+		for name in ("symbol", "interval"):
+			if not params.get(name):
+				return 400, _error(-1102, f"Mandatory parameter '{name}' was not sent, was empty/null, or malformed.")
+		try:
+			return 200, await self.get_klines(path, params)
+		except UpstreamRejected as exc:
+			return exc.status, exc.body
+		except Exception as exc:  # noqa: BLE001
+			return 502, json.dumps({"error": "upstream failed", "detail": str(exc)}).encode()
+
+	async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+		return await asyncio.start_server(self.handle, host, port)
+
+
+def _reason(status: int) -> str:
+	try:
+		return HTTPStatus(status).phrase
+	except ValueError:
+		return "Unknown"
+
+
+def _error(code: int, msg: str) -> bytes:
+	return json.dumps({"code": code, "msg": msg}).encode()
+
+
+def run_gateway(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ttl: float = 3.0) -> None:
+	async def _main() -> None:
+		server = await KlineGateway(ttl=ttl).serve(host, port)
+		print(f"Kline gateway listening on http://{host}:{port}")
+		async with server:
+			await server.serve_forever()
+
+	asyncio.run(_main())
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
-from src.config import settings
-from src.data.market_data import fetch_futures_klines_df
 from src.exchange.binance_futures_client import BinanceUSDMClient
+from src.exchange.instrument import Instrument
+from src.risk.performance import PerformanceTracker
 from src.risk.risk_manager import RiskManager
-from src.strategy.ema_cross import add_ema_features
+from src.strategy.ema_scalar import last_ema_cross
 
 
 class EMAFuturesTrader:
@@ -33,6 +33,20 @@ class EMAFuturesTrader:
 		self.dry_run = dry_run
 		self.position_side = position_side
 		self.risk = RiskManager()
+		self._instrument: Optional[Instrument] = None
+		# 按信号的持仓（含纸面模式）逐根计算的运行绩效
+		self.performance = PerformanceTracker()
+		self._bar_time: Optional[int] = None
+		self._prev_close: Optional[Decimal] = None
+		self._entry_price: Optional[Decimal] = None
+		# 实盘已成交的持仓数量；平仓按它下单，全部成交才算平掉
+		self._entry_qty: Optional[Decimal] = None
+
+	def instrument(self) -> Instrument:
+		# exchangeInfo 很重，过滤器在进程内只取一次
+		if self._instrument is None:
+			self._instrument = Instrument.from_filters(self.symbol, self.client.get_symbol_filters(self.symbol))
+		return self._instrument
 
 	def ensure_leverage(self) -> None:
 		if self.dry_run:
@@ -40,38 +54,86 @@ class EMAFuturesTrader:
 		self.client.change_leverage(self.symbol, self.leverage)
 
 	def step(self) -> None:
-		df = fetch_futures_klines_df(self.client, self.symbol, self.interval, limit=300)
-		df = add_ema_features(df, fast=self.fast, slow=self.slow).dropna()
-
-		last_cross = int(df["cross"].iloc[-1])
-		last_close = Decimal(str(df["close"].iloc[-1]))
+		# 单次运行只需最后一根的交叉状态：纯 Python 计算，避免导入 pandas
+		klines = self.client.get_klines(symbol=self.symbol, interval=self.interval, limit=300)
+		closes = [float(k[4]) for k in klines]
+		last_cross, _ = last_ema_cross(closes, fast=self.fast, slow=self.slow)
+		last_close = Decimal(str(closes[-1]))
 
 		print(f"Futures last close={last_close}, cross={last_cross}")
+		self._mark(int(klines[-1][6]), last_close)
 		self.ensure_leverage()
 
 		if last_cross == 1:
 			self._open_long(last_close)
 		elif last_cross == -1:
-			self._close_long()
+			self._close_long(last_close)
 		else:
 			print("No action.")
 
+	def state(self) -> Dict[str, Any]:
+		"""Per-bar marks needed to continue ``performance`` in a later run."""
+		return {
+			"bar_time": self._bar_time,
+			"prev_close": None if self._prev_close is None else str(self._prev_close),
+			"entry_price": None if self._entry_price is None else str(self._entry_price),
+			"entry_qty": None if self._entry_qty is None else str(self._entry_qty),
+		}
+
+	def restore(self, state: Optional[Dict[str, Any]]) -> None:
+		if not state:
+			return
+		self._bar_time = state["bar_time"]
+		self._prev_close = None if state["prev_close"] is None else Decimal(state["prev_close"])
+		self._entry_price = None if state["entry_price"] is None else Decimal(state["entry_price"])
+		self._entry_qty = None if state.get("entry_qty") is None else Decimal(state["entry_qty"])
+
+	def _mark(self, bar_time: int, close: Decimal) -> None:
+		# 同一根K线内多次 step 只计一次收益
+		if bar_time == self._bar_time:
+			return
+		if self._prev_close is not None:
+			held = self._entry_price is not None
+			ret = float(close / self._prev_close - 1) * self.leverage if held else 0.0
+			self.performance.update_bar(ret, held)
+		self._bar_time = bar_time
+		self._prev_close = close
+
 	def _compute_qty(self, price: Decimal) -> Decimal:
 		# Futures uses quantity. Convert quote allocation into base qty using leverage
 		quote_alloc = self.quote_per_trade or self.risk.compute_quote_allocation(Decimal("100"))  # fallback
-		notional = quote_alloc * Decimal(str(self.leverage))
-		qty = (notional / price)
-		filters = self.client.get_symbol_filters(self.symbol)
-		qty = self.client.round_to_step(Decimal(qty), filters.lot_step_size)
-		return qty
+		return self.instrument().size(quote_alloc, price, self.leverage)
+
+	@staticmethod
+	def _filled(res: Dict[str, Any], price: Decimal, qty: Decimal) -> Tuple[Decimal, Decimal]:
+		"""(avgPrice, executedQty) of an order response; the sent values if the response has none."""
+		avg = Decimal(str(res.get("avgPrice") or 0))
+		executed = Decimal(str(res.get("executedQty") or 0))
+		return (avg if avg > 0 else price), (executed if executed > 0 else qty)
+
+	def _on_open(self, price: Decimal, qty: Optional[Decimal] = None) -> None:
+		if qty is not None:
+			self._entry_qty = (self._entry_qty or Decimal("0")) + qty
+		if self._entry_price is None:
+			self._entry_price = price
+			self.performance.record_fill()
+
+	def _on_close(self, price: Decimal) -> None:
+		self._entry_qty = None
+		if self._entry_price is not None:
+			self.performance.close_trade(float(price / self._entry_price - 1) * self.leverage)
+			self._entry_price = None
+			self.performance.record_fill()
 
 	def _open_long(self, last_price: Decimal) -> None:
 		if self.dry_run:
 			print("[DRY] OPEN LONG")
+			self._on_open(last_price)
 			return
 		qty = self._compute_qty(last_price)
-		if qty <= Decimal("0"):
-			print("Qty is zero; skip buy.")
+		reason = self.instrument().check(qty, last_price)
+		if reason:
+			print(f"Skip buy: {reason}.")
 			return
 		print(f"OPEN LONG {self.symbol} qty={qty}")
 		res = self.client.new_market_order(
@@ -81,16 +143,16 @@ class EMAFuturesTrader:
 			position_side=self.position_side,
 		)
 		print(f"Order: {res.get('orderId')}")
+		self._on_open(*self._filled(res, last_price, qty))
 
-	def _close_long(self) -> None:
+	def _close_long(self, last_price: Decimal) -> None:
 		if self.dry_run:
 			print("[DRY] CLOSE LONG (reduceOnly)")
+			self._on_close(last_price)
 			return
-		# In one-way mode, reduceOnly SELL without specifying qty closes proportionally.
-		# We compute a conservative qty by filters (user can refine to fetch real position size).
-		filters = self.client.get_symbol_filters(self.symbol)
-		qty = filters.lot_min_qty
-		print(f"CLOSE LONG {self.symbol} qty>={qty} reduceOnly")
+		# 按记录的持仓数量平仓；数量未知（旧状态文件）时只能保守地下最小数量
+		qty = self._entry_qty or self.instrument().min_quantity
+		print(f"CLOSE LONG {self.symbol} qty={qty} reduceOnly")
 		res = self.client.new_market_order(
 			symbol=self.symbol,
 			side="SELL",
@@ -98,4 +160,14 @@ class EMAFuturesTrader:
 			reduce_only=True,
 			position_side=self.position_side,
 		)
-		print(f"Order: {res.get('orderId')}") 
\ No newline at end of file
+		print(f"Order: {res.get('orderId')}")
+		price, executed = self._filled(res, last_price, qty)
+		if self._entry_qty is not None and executed < self._entry_qty:
+			# 只减掉了部分仓位：继续按持仓计绩效，下次平仓信号再平剩余部分
+			self._entry_qty -= executed
+			print(f"Position not flat after reduce: {self._entry_qty} left.")
+			return
+		if self._entry_qty is None and self._entry_price is not None:
+			print("Position size unknown; keeping it open in performance.")
+			return
+		self._on_close(price) 
\ No newline at end of file
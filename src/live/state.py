@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+from src.live.futures_trader import EMAFuturesTrader
+from src.risk.performance import PerformanceBook, PerformanceSnapshot
+
+
+class TraderStateStore:
+    """Running performance of one-shot traders, kept on disk between runs.
+
+    ``futures-paper`` / ``futures-live`` run a single ``step`` per process, so
+    the trader's bar marks and ``PerformanceTracker`` are loaded before the
+    step and written back after it. Each (symbol, interval) has its own JSON
+    file, so traders for different symbols can run concurrently; ``load_all``
+    collects every file into one ``PerformanceBook``.
+    """
+
+    def __init__(self, root: str | Path, period: int = 365) -> None:
+        self.root = Path(root)
+        self.book = PerformanceBook(period=period)
+
+    @staticmethod
+    def key(symbol: str, interval: str) -> str:
+        return f"{symbol.upper()}_{interval}"
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _read(self, key: str) -> Dict:
+        path = self.path(key)
+        if not path.exists():
+            return {}
+        data = json.loads(path.read_text())
+        if data.get("performance"):
+            self.book.tracker(key).restore(data["performance"])
+        return data
+
+    def attach(self, trader: EMAFuturesTrader) -> None:
+        key = self.key(trader.symbol, trader.interval)
+        data = self._read(key)
+        trader.performance = self.book.tracker(key)
+        trader.restore(data.get("marks"))
+
+    def save(self, trader: EMAFuturesTrader) -> None:
+        key = self.key(trader.symbol, trader.interval)
+        data = {"marks": trader.state(), "performance": trader.performance.to_state()}
+        self.root.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，进程中途退出也不会留下半个 JSON
+        tmp = self.path(key).with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.path(key))
+
+    def load_all(self) -> Dict[str, PerformanceSnapshot]:
+        keys = sorted(p.stem for p in self.root.glob("*.json"))
+        for key in keys:
+            self._read(key)
+        return self.book.snapshot(keys)
@@ -6,7 +6,7 @@ from typing import Optional
 
 import pandas as pd
 
-from src.config import settings
+from src.config import get_settings
 from src.data.market_data import fetch_klines_df
 from src.exchange.binance_client import BinanceSpotClient
 from src.risk.risk_manager import RiskManager
@@ -58,7 +58,7 @@ class EMATrader:
             raise RuntimeError("Private client not initialized.")
 
         account = self.client.get_account()
-        quote_asset = settings.default_quote_asset
+        quote_asset = get_settings().default_quote_asset
         quote_balance = _get_free_balance(account, quote_asset)
 
         quote_to_spend = self.quote_per_trade or self.risk.compute_quote_allocation(quote_balance)
@@ -79,7 +79,7 @@ class EMATrader:
             raise RuntimeError("Private client not initialized.")
 
         account = self.client.get_account()
-        base_asset = self.symbol.replace(settings.default_quote_asset, "")
+        base_asset = self.symbol.replace(get_settings().default_quote_asset, "")
         base_balance = _get_free_balance(account, base_asset)
         if base_balance <= Decimal("0"):
             print("No base asset to sell.")
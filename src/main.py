@@ -1,20 +1,261 @@
 from __future__ import annotations
 
 import argparse
-from decimal import Decimal
+import sys
+from pathlib import Path
 
-import pandas as pd
+from src.config import get_settings
 
-from src.backtest.backtester import run_backtest
-from src.config import settings
-from src.data.market_data import fetch_klines_df
-from src.exchange.binance_client import BinanceSpotClient
-from src.exchange.binance_futures_client import BinanceUSDMClient
-from src.live.trader import EMATrader
-from src.live.futures_trader import EMAFuturesTrader
+# 子命令的实现按需导入：定时任务里的 futures-paper / futures-live 只加载
+# requests 与交易逻辑，不再为 pandas、现货 connector 等付出启动开销。
 
 
-def main() -> None:
+def _futures_client(public_only: bool = False, bus: str | None = None):
+    from src.exchange.binance_futures_client import BinanceUSDMClient
+
+    settings = get_settings()
+    if public_only:
+        return BinanceUSDMClient(use_testnet=settings.use_testnet)
+    kwargs = dict(
+        api_key=settings.binance_api_key,
+        api_secret=settings.binance_api_secret,
+        use_testnet=settings.use_testnet,
+    )
+    if bus:
+        from src.bus.client import BusUSDMClient
+
+        return BusUSDMClient(bus, **kwargs)
+    return BinanceUSDMClient(**kwargs)
+
+
+def _print_stats(stats: dict) -> None:
+    for k, v in stats.items():
+        print(f"- {k}: {v}")
+
+
+def _print_robustness(result: dict, args: argparse.Namespace) -> None:
+    if args.mc_paths <= 0:
+        return
+    from tabulate import tabulate
+
+    from src.backtest.robustness import run_robustness
+
+    table = run_robustness(result, n_paths=args.mc_paths, seed=args.mc_seed, workers=args.mc_workers)
+    print(f"Robustness ({args.mc_paths} paths, 95% intervals):")
+    print(tabulate(table.reset_index(), headers="keys", showindex=False, floatfmt=".4f"))
+
+
+def cmd_backtest(args: argparse.Namespace) -> None:
+    from src.backtest.backtester import run_backtest
+    from src.data.market_data import fetch_klines_df
+    from src.exchange.binance_client import BinanceSpotClient
+
+    client = BinanceSpotClient(use_testnet=True)
+    df = fetch_klines_df(client, args.symbol, args.interval, limit=args.limit)
+    result = run_backtest(df, fast=args.fast, slow=args.slow)
+    print("Backtest Stats:")
+    _print_stats(result["stats"])
+    _print_robustness(result, args)
+
+
+def cmd_futures_backtest(args: argparse.Namespace) -> None:
+    from src.backtest.backtester import run_backtest
+    from src.data.market_data import fetch_futures_klines_df
+
+    df = fetch_futures_klines_df(_futures_client(), args.symbol, args.interval, limit=args.limit)
+    result = run_backtest(df, fast=args.fast, slow=args.slow)
+    _print_stats(result["stats"])
+    _print_robustness(result, args)
+
+
+def cmd_futures_step(args: argparse.Namespace) -> None:
+    from src.live.futures_trader import EMAFuturesTrader
+
+    trader = EMAFuturesTrader(
+        client=_futures_client(bus=args.bus),
+        symbol=args.symbol,
+        interval=args.interval,
+        fast=args.fast,
+        slow=args.slow,
+        leverage=args.leverage,
+        dry_run=(args.cmd == "futures-paper"),
+    )
+    state_dir = _state_dir(args.state_dir, args.cmd)
+    if state_dir is None:
+        trader.step()
+        return
+
+    from src.live.state import TraderStateStore
+
+    store = TraderStateStore(state_dir)
+    store.attach(trader)
+    trader.step()
+    # 订单已经发出，状态写不进去只告警，不让这一步失败
+    try:
+        store.save(trader)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not save trader state to {state_dir}: {e}", file=sys.stderr)
+    print(f"Performance ({store.key(trader.symbol, trader.interval)}):")
+    _print_stats(trader.performance.snapshot().to_dict())
+
+
+def _state_dir(state_dir: str | None, mode: str) -> str | None:
+    # 仅在配置了目录（--state-dir 或 TRADER_STATE_DIR）时持久化，按命令区分纸面/实盘
+    if not state_dir:
+        return None
+    return str(Path(state_dir) / mode)
+
+
+def cmd_futures_report(args: argparse.Namespace) -> None:
+    from tabulate import tabulate
+
+    from src.live.state import TraderStateStore
+
+    state_dir = _state_dir(args.state_dir, args.mode)
+    if state_dir is None:
+        print("No state directory configured (set TRADER_STATE_DIR or pass --state-dir).")
+        return
+    snapshots = TraderStateStore(state_dir).load_all()
+    if not snapshots:
+        print("No trader state found.")
+        return
+    rows = [{"key": k, **snap.to_dict()} for k, snap in snapshots.items()]
+    print(tabulate(rows, headers="keys", floatfmt=".4f"))
+
+
+def cmd_futures_screen(args: argparse.Namespace) -> None:
+    from tabulate import tabulate
+
+    from src.screener.ema_screener import run_screener
+
+    table = run_screener(
+        _futures_client(public_only=True),
+        interval=args.interval,
+        fast=args.fast,
+        slow=args.slow,
+        limit=args.limit,
+        max_age=args.max_age,
+        workers=args.workers,
+    )
+    print(tabulate(table.head(args.top), headers="keys", showindex=False, floatfmt=".4f"))
+
+
+def cmd_import_archives(args: argparse.Namespace) -> None:
+    from src.data.archive_import import export_archives, find_archives
+
+    archives = find_archives(args.path, symbol=args.symbol, interval=args.interval)
+    summary = export_archives(archives, args.out, workers=args.workers, verify=not args.no_verify)
+    print(f"Imported {summary['archives']} archives, {summary['bars']} bars")
+    if summary["bars"]:
+        print(f"- start: {summary['start']}")
+        print(f"- end: {summary['end']}")
+
+
+def _tick_paths(path: str, symbol: str):
+    from pathlib import Path
+
+    from src.data.aggtrades import find_aggtrades
+
+    return [Path(path)] if Path(path).is_file() else find_aggtrades(path, symbol=symbol)
+
+
+def cmd_convert_aggtrades(args: argparse.Namespace) -> None:
+    from src.data.aggtrades import write_tick_file
+
+    archives = _tick_paths(args.path, args.symbol)
+    total = write_tick_file(archives, args.out, verify=not args.no_verify)
+    print(f"Wrote {total} ticks from {len(archives)} archives to {args.out}")
+
+
+def cmd_tick_backtest(args: argparse.Namespace) -> None:
+    from src.backtest.tick_backtester import run_tick_backtest
+
+    result = run_tick_backtest(
+        _tick_paths(args.path, args.symbol),
+        interval=args.interval,
+        fast=args.fast,
+        slow=args.slow,
+        fee_bps=args.fee_bps,
+        latency_ms=args.latency_ms,
+        slippage_bps=args.slippage_bps,
+        queue_trades=args.queue,
+        match_side=not args.any_side,
+        verify=not args.no_verify,
+    )
+    print("Tick Backtest Stats:")
+    _print_stats(result["stats"])
+
+
+def cmd_futures_replay(args: argparse.Namespace) -> None:
+    from decimal import Decimal
+
+    from src.sim.replay import load_bars_csv, replay_futures_trader
+
+    account = replay_futures_trader(
+        load_bars_csv(args.csv),
+        symbol=args.symbol,
+        interval=args.interval,
+        base_interval=args.base_interval,
+        fast=args.fast,
+        slow=args.slow,
+        leverage=args.leverage,
+        quote_per_trade=Decimal(str(args.quote)),
+        fee_bps=args.fee_bps,
+        slippage_bps=args.slippage_bps,
+        transport="http" if args.http else "inprocess",
+    )
+    print("Replay result:")
+    for k in ("steps", "orders", "rejected", "totalWalletBalance", "totalUnrealizedProfit"):
+        print(f"- {k}: {account[k]}")
+    print("Signal performance:")
+    _print_stats(account["performance"])
+
+
+def cmd_sim_server(args: argparse.Namespace) -> None:
+    from src.sim.exchange_sim import ExchangeSimulator, SimSymbol, run_sim_server
+    from src.sim.replay import load_bars_csv
+
+    quote = get_settings().default_quote_asset
+    sym = SimSymbol(
+        args.symbol,
+        args.symbol.replace(quote, ""),
+        quote,
+        load_bars_csv(args.csv),
+        base_interval=args.base_interval,
+    )
+    run_sim_server(ExchangeSimulator([sym], speed=args.speed), host=args.host, port=args.port)
+
+
+def cmd_bus_publish(args: argparse.Namespace) -> None:
+    from src.bus.publisher import MarketDataPublisher
+    from src.strategy.pipeline import bollinger, ema_cross
+
+    publisher = MarketDataPublisher(
+        _futures_client(public_only=True),
+        args.bus,
+        [s for s in args.symbols.split(",") if s],
+        interval=args.interval,
+        capacity=args.capacity,
+        nodes=ema_cross(args.fast, args.slow) + bollinger(20, 2.0),
+    )
+    print(f"Publishing {', '.join(publisher.symbols)} {args.interval} to {args.bus}")
+    publisher.run(poll=args.poll)
+
+
+def cmd_gateway(args: argparse.Namespace) -> None:
+    from src.gateway.kline_gateway import run_gateway
+
+    run_gateway(host=args.host, port=args.port, ttl=args.ttl)
+
+
+def _add_robustness_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--mc-paths", type=int, default=0, help="Bootstrap/shuffle/cost resamples for confidence intervals")
+    p.add_argument("--mc-workers", type=int, default=1)
+    p.add_argument("--mc-seed", type=int, default=None)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    settings = get_settings()
     parser = argparse.ArgumentParser(description="Binance Quant Trading (EMA Crossover)")
     sub = parser.add_subparsers(dest="cmd", required=True)
 
@@ -25,6 +266,8 @@ def main() -> None:
     p_back.add_argument("--limit", type=int, default=settings.backtest_limit)
     p_back.add_argument("--fast", type=int, default=12)
     p_back.add_argument("--slow", type=int, default=26)
+    _add_robustness_args(p_back)
+    p_back.set_defaults(handler=cmd_backtest)
 
     # futures backtest (USDM)
     p_fback = sub.add_parser("futures-backtest", help="Run backtest with USDM futures data")
@@ -33,6 +276,8 @@ def main() -> None:
     p_fback.add_argument("--limit", type=int, default=settings.backtest_limit)
     p_fback.add_argument("--fast", type=int, default=12)
     p_fback.add_argument("--slow", type=int, default=26)
+    _add_robustness_args(p_fback)
+    p_fback.set_defaults(handler=cmd_futures_backtest)
 
     # futures paper
     p_fpaper = sub.add_parser("futures-paper", help="USDM paper trading (no orders)")
@@ -41,6 +286,9 @@ def main() -> None:
     p_fpaper.add_argument("--fast", type=int, default=12)
     p_fpaper.add_argument("--slow", type=int, default=26)
     p_fpaper.add_argument("--leverage", type=int, default=5)
+    p_fpaper.add_argument("--bus", default=settings.market_bus_dir, help="Read klines from this market-data bus directory")
+    p_fpaper.add_argument("--state-dir", default=settings.trader_state_dir, help="Keep performance between runs under <dir>/<command> (default TRADER_STATE_DIR, unset = off)")
+    p_fpaper.set_defaults(handler=cmd_futures_step)
 
     # futures live
     p_flive = sub.add_parser("futures-live", help="USDM live trading (testnet by default)")
@@ -49,46 +297,108 @@ def main() -> None:
     p_flive.add_argument("--fast", type=int, default=12)
     p_flive.add_argument("--slow", type=int, default=26)
     p_flive.add_argument("--leverage", type=int, default=5)
+    p_flive.add_argument("--bus", default=settings.market_bus_dir, help="Read klines from this market-data bus directory")
+    p_flive.add_argument("--state-dir", default=settings.trader_state_dir, help="Keep performance between runs under <dir>/<command> (default TRADER_STATE_DIR, unset = off)")
+    p_flive.set_defaults(handler=cmd_futures_step)
 
-    args = parser.parse_args()
-
-    if args.cmd == "backtest":
-        client = BinanceSpotClient(use_testnet=True)
-        df = fetch_klines_df(client, args.symbol, args.interval, limit=args.limit)
-        result = run_backtest(df, fast=args.fast, slow=args.slow)
-        stats = result["stats"]
-        print("Backtest Stats:")
-        for k, v in stats.items():
-            print(f"- {k}: {v}")
-    elif args.cmd == "futures-backtest":
-        fclient = BinanceUSDMClient(
-            api_key=settings.binance_api_key,
-            api_secret=settings.binance_api_secret,
-            use_testnet=settings.use_testnet,
-        )
-        df = fetch_futures_klines_df(fclient, args.symbol, args.interval, limit=args.limit)
-        result = run_backtest(df, fast=args.fast, slow=args.slow)
-        for k, v in result["stats"].items():
-            print(f"- {k}: {v}")
-    elif args.cmd in {"futures-paper", "futures-live"}:
-        fclient = BinanceUSDMClient(
-            api_key=settings.binance_api_key,
-            api_secret=settings.binance_api_secret,
-            use_testnet=settings.use_testnet,
-        )
-        trader = EMAFuturesTrader(
-            client=fclient,
-            symbol=args.symbol,
-            interval=args.interval,
-            fast=args.fast,
-            slow=args.slow,
-            leverage=args.leverage,
-            dry_run=(args.cmd == "futures-paper"),
-        )
-        trader.step()
-    else:
-        parser.error("Unknown command")
+    p_frep = sub.add_parser("futures-report", help="Running performance saved by futures-paper / futures-live")
+    p_frep.add_argument("--mode", choices=["futures-paper", "futures-live"], default="futures-paper")
+    p_frep.add_argument("--state-dir", default=settings.trader_state_dir, help="Same directory as futures-paper / futures-live")
+    p_frep.set_defaults(handler=cmd_futures_report)
+
+    # futures screener (all USDT perpetuals)
+    p_scr = sub.add_parser("futures-screen", help="Scan USDM perpetuals for fresh EMA crosses")
+    p_scr.add_argument("--interval", default=settings.backtest_interval)
+    p_scr.add_argument("--fast", type=int, default=12)
+    p_scr.add_argument("--slow", type=int, default=26)
+    p_scr.add_argument("--limit", type=int, default=300)
+    p_scr.add_argument("--max-age", type=int, default=3, help="Max bars since the cross")
+    p_scr.add_argument("--top", type=int, default=30)
+    p_scr.add_argument("--workers", type=int, default=16)
+    p_scr.set_defaults(handler=cmd_futures_screen)
+
+    # bulk import of data.binance.vision kline archives
+    p_imp = sub.add_parser("import-archives", help="Import Binance public kline ZIP archives")
+    p_imp.add_argument("--path", required=True, help="Directory containing *.zip and *.zip.CHECKSUM")
+    p_imp.add_argument("--symbol", default=None)
+    p_imp.add_argument("--interval", default=None)
+    p_imp.add_argument("--workers", type=int, default=4)
+    p_imp.add_argument("--no-verify", action="store_true", help="Skip .CHECKSUM verification")
+    p_imp.add_argument("--out", default=None, help="Stream the merged bars to this CSV")
+    p_imp.set_defaults(handler=cmd_import_archives)
+
+    # aggTrades tick data
+    p_conv = sub.add_parser("convert-aggtrades", help="Convert aggTrades archives into a memory-mappable tick file")
+    p_conv.add_argument("--path", required=True, help="Directory with *-aggTrades-*.zip, or a single archive")
+    p_conv.add_argument("--symbol", default=settings.backtest_symbol)
+    p_conv.add_argument("--out", required=True, help="Output .bin tick file")
+    p_conv.add_argument("--no-verify", action="store_true", help="Skip .CHECKSUM verification")
+    p_conv.set_defaults(handler=cmd_convert_aggtrades)
+
+    p_tick = sub.add_parser("tick-backtest", help="Replay aggTrades with intrabar fills after latency")
+    p_tick.add_argument("--path", required=True, help="Tick .bin file, aggTrades archive, or a directory of archives")
+    p_tick.add_argument("--symbol", default=settings.backtest_symbol)
+    p_tick.add_argument("--interval", default="1m")
+    p_tick.add_argument("--fast", type=int, default=12)
+    p_tick.add_argument("--slow", type=int, default=26)
+    p_tick.add_argument("--fee-bps", type=float, default=10.0)
+    p_tick.add_argument("--latency-ms", type=int, default=50)
+    p_tick.add_argument("--slippage-bps", type=float, default=0.0, help="Extra adverse slippage on top of the tape price")
+    p_tick.add_argument("--queue", type=int, default=0, help="Matching trades to skip before the fill")
+    p_tick.add_argument("--any-side", action="store_true", help="Fill on any trade, not only same-side aggressors")
+    p_tick.add_argument("--no-verify", action="store_true", help="Skip .CHECKSUM verification of archives")
+    p_tick.set_defaults(handler=cmd_tick_backtest)
+
+    # replay a futures trader against the local exchange simulator
+    p_rep = sub.add_parser("futures-replay", help="Replay stored bars through EMAFuturesTrader on a local simulator")
+    p_rep.add_argument("--csv", required=True, help="Bars from import-archives --out")
+    p_rep.add_argument("--symbol", default=settings.backtest_symbol)
+    p_rep.add_argument("--interval", default=settings.backtest_interval)
+    p_rep.add_argument("--base-interval", default="1m", help="Interval of the bars in --csv")
+    p_rep.add_argument("--fast", type=int, default=12)
+    p_rep.add_argument("--slow", type=int, default=26)
+    p_rep.add_argument("--leverage", type=int, default=5)
+    p_rep.add_argument("--quote", type=float, default=50.0)
+    p_rep.add_argument("--fee-bps", type=float, default=4.0)
+    p_rep.add_argument("--slippage-bps", type=float, default=1.0)
+    p_rep.add_argument("--http", action="store_true", help="Go through the HTTP front-end instead of in-process calls")
+    p_rep.set_defaults(handler=cmd_futures_replay)
+
+    # standalone exchange simulator (HTTP), e.g. as a load-test target
+    p_sim = sub.add_parser("sim-server", help="Serve stored bars through a local Binance-compatible simulator")
+    p_sim.add_argument("--csv", required=True, help="Bars from import-archives --out")
+    p_sim.add_argument("--symbol", default=settings.backtest_symbol)
+    p_sim.add_argument("--base-interval", default="1m")
+    p_sim.add_argument("--speed", type=float, default=60.0, help="Simulated seconds per wall-clock second")
+    p_sim.add_argument("--host", default="127.0.0.1")
+    p_sim.add_argument("--port", type=int, default=8788)
+    p_sim.set_defaults(handler=cmd_sim_server)
+
+    # shared-memory market-data bus
+    p_bus = sub.add_parser("bus-publish", help="Publish klines + indicators to local memory-mapped ring buffers")
+    p_bus.add_argument("--symbols", default=settings.backtest_symbol, help="Comma-separated, e.g. BTCUSDT,ETHUSDT")
+    p_bus.add_argument("--interval", default=settings.backtest_interval)
+    p_bus.add_argument("--bus", default=settings.market_bus_dir or ".bus")
+    p_bus.add_argument("--capacity", type=int, default=1000, help="Bars kept per ring")
+    p_bus.add_argument("--fast", type=int, default=12)
+    p_bus.add_argument("--slow", type=int, default=26)
+    p_bus.add_argument("--poll", type=float, default=5.0)
+    p_bus.set_defaults(handler=cmd_bus_publish)
+
+    # local kline gateway
+    p_gw = sub.add_parser("gateway", help="Serve cached/coalesced klines for local clients")
+    p_gw.add_argument("--host", default="127.0.0.1")
+    p_gw.add_argument("--port", type=int, default=8787)
+    p_gw.add_argument("--ttl", type=float, default=3.0)
+    p_gw.set_defaults(handler=cmd_gateway)
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    args.handler(args)
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
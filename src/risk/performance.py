@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Optional
+
+# 跨进程保存/恢复的累加器字段（对应 PerformanceTracker 的 _xxx 属性）
+_STATE_FIELDS = ("bars", "equity", "peak", "max_dd", "mean", "m2", "trades", "closed", "wins", "exposed")
+
+
+@dataclass(frozen=True)
+class PerformanceSnapshot:
+    bars: int
+    final_equity: float
+    peak_equity: float
+    drawdown_pct: float
+    return_pct: float
+    max_dd_pct: float
+    sharpe: float
+    trades: int
+    closed_trades: int
+    win_rate_pct: float
+    exposure_pct: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+class PerformanceTracker:
+    """Running performance of one strategy, updated in O(1) per bar or fill.
+
+    Equity compounds per-bar net returns like ``run_backtest``; drawdown is
+    measured against the running peak of that equity (the first bar seeds the
+    peak, as in ``_max_drawdown``), and Sharpe uses Welford's mean/variance
+    (ddof=1, as in ``_sharpe``). Updates and ``snapshot`` are guarded by a
+    lock, so a dashboard thread can read while the trading loop writes.
+    ``to_state`` / ``restore`` carry the accumulators across processes.
+    """
+
+    def __init__(self, period: int = 365, risk_free: float = 0.0) -> None:
+        self.period = period
+        self.risk_free = risk_free
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._bars = 0
+            self._equity = 1.0
+            self._peak: Optional[float] = None
+            self._max_dd = 0.0
+            self._mean = 0.0
+            self._m2 = 0.0
+            self._trades = 0
+            self._closed = 0
+            self._wins = 0
+            self._exposed = 0
+
+    def to_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: getattr(self, f"_{name}") for name in _STATE_FIELDS}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            for name in _STATE_FIELDS:
+                setattr(self, f"_{name}", state[name])
+
+    # -------- Updates --------
+    def update_bar(self, net_return: float, exposed: bool = False) -> None:
+        """One bar's net return (after fees); ``exposed`` if a position was held through it."""
+        with self._lock:
+            self._bars += 1
+            self._equity *= 1.0 + net_return
+            if self._peak is None or self._equity > self._peak:
+                self._peak = self._equity
+            dd = self._equity / self._peak - 1.0
+            if dd < self._max_dd:
+                self._max_dd = dd
+            x = net_return - self.risk_free / self.period
+            delta = x - self._mean
+            self._mean += delta / self._bars
+            self._m2 += delta * (x - self._mean)
+            if exposed:
+                self._exposed += 1
+
+    def record_fill(self) -> None:
+        """An entry or exit order (``trades`` in ``run_backtest`` stats)."""
+        with self._lock:
+            self._trades += 1
+
+    def close_trade(self, trade_return: float) -> None:
+        """A finished round trip with its net return; feeds the win rate."""
+        with self._lock:
+            self._closed += 1
+            if trade_return > 0:
+                self._wins += 1
+
+    # -------- Reads --------
+    def snapshot(self) -> PerformanceSnapshot:
+        with self._lock:
+            peak = self._peak if self._peak is not None else self._equity
+            std = math.sqrt(self._m2 / (self._bars - 1)) if self._bars > 1 else 0.0
+            return PerformanceSnapshot(
+                bars=self._bars,
+                final_equity=self._equity,
+                peak_equity=peak,
+                drawdown_pct=(self._equity / peak - 1.0) * 100.0,
+                return_pct=(self._equity - 1.0) * 100.0,
+                max_dd_pct=self._max_dd * 100.0,
+                sharpe=math.sqrt(self.period) * self._mean / std if std > 0 else 0.0,
+                trades=self._trades,
+                closed_trades=self._closed,
+                win_rate_pct=self._wins / self._closed * 100.0 if self._closed else 0.0,
+                exposure_pct=self._exposed / self._bars * 100.0 if self._bars else 0.0,
+            )
+
+    @classmethod
+    def from_backtest(cls, result: dict, period: int = 365) -> "PerformanceTracker":
+        """Replay a ``run_backtest`` result bar by bar."""
+        from src.backtest.robustness import trade_returns
+
+        tracker = cls(period=period)
+        net = result["returns"].to_numpy(dtype=float).tolist()
+        held = (result["position"].shift(1).fillna(0) != 0).to_numpy().tolist()
+        fills = (result["data"]["cross"].abs() == 1).to_numpy().tolist()
+        for r, h, f in zip(net, held, fills):
+            tracker.update_bar(r, h)
+            if f:
+                tracker.record_fill()
+        for r in trade_returns(result["returns"], result["position"]).tolist():
+            tracker.close_trade(r)
+        return tracker
+
+
+class PerformanceBook:
+    """Trackers for many symbols behind one lock-free lookup."""
+
+    def __init__(self, period: int = 365) -> None:
+        self.period = period
+        self._trackers: Dict[str, PerformanceTracker] = {}
+        self._lock = threading.Lock()
+
+    def tracker(self, key: str) -> PerformanceTracker:
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            with self._lock:
+                tracker = self._trackers.setdefault(key, PerformanceTracker(period=self.period))
+        return tracker
+
+    def snapshot(self, keys: Optional[Iterable[str]] = None) -> Dict[str, PerformanceSnapshot]:
+        keys = list(keys) if keys is not None else list(self._trackers)
+        return {k: self._trackers[k].snapshot() for k in keys if k in self._trackers}
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.exchange.binance_futures_client import BinanceUSDMClient
+
+# USDM 默认 IP 限额为 2400 weight/分钟，预留余量给同机的交易进程
+DEFAULT_WEIGHT_PER_MINUTE = 1800
+
+
+def klines_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightBudget:
+    """Thread-safe token bucket over request weight, refilled per minute."""
+
+    def __init__(self, per_minute: int = DEFAULT_WEIGHT_PER_MINUTE) -> None:
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = (weight - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def usdt_perpetuals(client: BinanceUSDMClient) -> List[str]:
+    info = client.get_exchange_info()
+    return sorted(
+        s["symbol"]
+        for s in info["symbols"]
+        if s.get("status") == "TRADING" and s.get("contractType") == "PERPETUAL" and s.get("quoteAsset") == "USDT"
+    )
+
+
+def fetch_universe(
+    client: BinanceUSDMClient,
+    symbols: List[str],
+    interval: str,
+    limit: int = 300,
+    workers: int = 16,
+    budget: Optional[WeightBudget] = None,
+) -> Dict[str, List[List[Any]]]:
+    budget = budget or WeightBudget()
+    weight = klines_weight(limit)
+
+    def load(symbol: str) -> Optional[List[List[Any]]]:
+        budget.acquire(weight)
+        try:
+            return client.get_klines(symbol=symbol, interval=interval, limit=limit)
+        except Exception as exc:  # noqa: BLE001 - one bad symbol must not abort the scan
+            print(f"Skip {symbol}: {exc}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(load, symbols))
+    return {s: r for s, r in zip(symbols, rows) if r}
+
+
+def align_closes(raw: Dict[str, List[List[Any]]]) -> tuple[pd.DatetimeIndex, List[str], np.ndarray, np.ndarray]:
+    """Stack klines into (time x symbol) close and quote-volume matrices.
+
+    Rows follow the union of close times; symbols listed later than others are
+    NaN-padded at the front.
+    """
+    symbols = list(raw)
+    times = np.unique(np.concatenate([np.array([int(k[6]) for k in raw[s]], dtype=np.int64) for s in symbols]))
+    close = np.full((len(times), len(symbols)), np.nan)
+    qvol = np.full((len(times), len(symbols)), np.nan)
+    for j, s in enumerate(symbols):
+        arr = np.array(raw[s], dtype=object)
+        pos = np.searchsorted(times, arr[:, 6].astype(np.int64))
+        close[pos, j] = arr[:, 4].astype(float)
+        qvol[pos, j] = arr[:, 7].astype(float)
+    return pd.to_datetime(times, unit="ms"), symbols, close, qvol
+
+
+def ema_2d(x: np.ndarray, span: int) -> np.ndarray:
+    """Column-wise EMA (adjust=False), seeded at each column's first value."""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1], np.nan)
+    for t in range(x.shape[0]):
+        row = x[t]
+        nxt = alpha * row + (1.0 - alpha) * prev
+        # 首个有效值作为种子；缺失值沿用上一 EMA
+        nxt = np.where(np.isnan(prev), row, nxt)
+        prev = np.where(np.isnan(row), prev, nxt)
+        out[t] = prev
+    return out
+
+
+def screen(close: np.ndarray, fast: int = 12, slow: int = 26) -> Dict[str, np.ndarray]:
+    """Latest signal, bars since its last flip and EMA spread for every column."""
+    ema_fast = ema_2d(close, fast)
+    ema_slow = ema_2d(close, slow)
+    signal = np.sign(ema_fast - ema_slow)
+    signal = np.where(np.isnan(signal), 0, signal)
+
+    # 只统计多空之间的翻转，忽略新上市币从无信号(0)进入的第一根
+    changed = np.zeros_like(signal, dtype=bool)
+    changed[1:] = (signal[1:] != signal[:-1]) & (signal[:-1] != 0)
+    n = len(signal)
+    rows = np.arange(n)[:, None]
+    last_flip = np.where(changed, rows, -1).max(axis=0)
+    cross_age = np.where(last_flip >= 0, n - 1 - last_flip, -1)
+
+    return {
+        "signal": signal[-1].astype(int),
+        "cross_age": cross_age,
+        "spread_pct": (ema_fast[-1] - ema_slow[-1]) / ema_slow[-1] * 100.0,
+        "ema_fast": ema_fast[-1],
+        "ema_slow": ema_slow[-1],
+    }
+
+
+def run_screener(
+    client: BinanceUSDMClient,
+    interval: str = "1h",
+    fast: int = 12,
+    slow: int = 26,
+    limit: int = 300,
+    max_age: int = 3,
+    symbols: Optional[List[str]] = None,
+    workers: int = 16,
+) -> pd.DataFrame:
+    symbols = symbols or usdt_perpetuals(client)
+    raw = fetch_universe(client, symbols, interval, limit=limit, workers=workers)
+    if not raw:
+        return pd.DataFrame(columns=["symbol", "side", "cross_age", "spread_pct", "close", "quote_volume"])
+    _, names, close, qvol = align_closes(raw)
+    res = screen(close, fast=fast, slow=slow)
+
+    table = pd.DataFrame(
+        {
+            "symbol": names,
+            "side": np.where(res["signal"] > 0, "LONG", np.where(res["signal"] < 0, "SHORT", "-")),
+            "cross_age": res["cross_age"],
+            "spread_pct": res["spread_pct"],
+            "close": pd.DataFrame(close).ffill().to_numpy()[-1],
+            "quote_volume": qvol[-1],
+        }
+    )
+    fresh = table[(table["cross_age"] >= 0) & (table["cross_age"] <= max_age)]
+    fresh = fresh.assign(_abs=fresh["spread_pct"].abs())
+    fresh = fresh.sort_values(["cross_age", "quote_volume", "_abs"], ascending=[True, False, False])
+    return fresh.drop(columns="_abs").reset_index(drop=True)
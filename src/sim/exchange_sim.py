@@ -0,0 +1,526 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from src.data.resample import INTERVAL_MS, resample_klines
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8788
+
+
+class SimError(Exception):
+	"""Rejected request, reported to clients as a Binance-style error body."""
+
+	def __init__(self, code: int, msg: str, status: int = 400) -> None:
+		super().__init__(msg)
+		self.code = code
+		self.msg = msg
+		self.status = status
+
+
+@dataclass
+class SimSymbol:
+	symbol: str
+	base_asset: str
+	quote_asset: str
+	bars: pd.DataFrame
+	base_interval: str = "1m"
+	step_size: str = "0.001"
+	min_qty: str = "0.001"
+	tick_size: str = "0.01"
+	min_notional: str = "5"
+
+
+@dataclass
+class FuturesPosition:
+	amount: Decimal = Decimal("0")
+	entry_price: Decimal = Decimal("0")
+	leverage: int = 20
+
+
+@dataclass
+class SimAccount:
+	futures_wallet: Decimal = Decimal("10000")
+	spot_balances: Dict[str, Decimal] = field(default_factory=lambda: {"USDT": Decimal("10000")})
+	positions: Dict[str, FuturesPosition] = field(default_factory=dict)
+
+
+class ExchangeSimulator:
+	"""In-memory stand-in for the Binance endpoints used by our clients.
+
+	Replays stored bars for each symbol. The clock either follows a replay
+	``speed`` multiplier of wall time, or (``speed=None``) only moves when
+	``advance`` is called, which makes runs fully deterministic. Market orders
+	fill at the current bar's close adjusted by ``slippage_bps`` and pay
+	``fee_bps`` on notional.
+	"""
+
+	def __init__(
+		self,
+		symbols: List[SimSymbol],
+		fee_bps: float = 4.0,
+		slippage_bps: float = 1.0,
+		speed: Optional[float] = None,
+		warmup_bars: int = 300,
+		account: Optional[SimAccount] = None,
+		wall_clock: Callable[[], float] = time.monotonic,
+	) -> None:
+		if not symbols:
+			raise ValueError("At least one symbol is required.")
+		self.symbols: Dict[str, SimSymbol] = {s.symbol: s for s in symbols}
+		self.fee = Decimal(str(fee_bps)) / Decimal("10000")
+		self.slippage = Decimal(str(slippage_bps)) / Decimal("10000")
+		self.account = account or SimAccount()
+		self.speed = speed
+		self.wall_clock = wall_clock
+		self.order_count = 0
+		self._lock = threading.Lock()
+		self._resampled: Dict[Tuple[str, str], Tuple[List[List[Any]], np.ndarray]] = {}
+		self._raw: Dict[str, List[List[Any]]] = {}
+		self._close_ms: Dict[str, np.ndarray] = {}
+		for s in symbols:
+			self._raw[s.symbol] = _to_raw(s.bars, s.base_interval)
+			self._close_ms[s.symbol] = np.array([r[6] for r in self._raw[s.symbol]], dtype=np.int64)
+
+		first = min(int(c[min(warmup_bars, len(c)) - 1]) for c in self._close_ms.values())
+		self.start_ms = first
+		self.now_ms = first
+		self._wall_start = wall_clock()
+
+	# -------- Clock --------
+	def server_time(self) -> int:
+		if self.speed is not None:
+			self.now_ms = self.start_ms + int((self.wall_clock() - self._wall_start) * 1000 * self.speed)
+		return self.now_ms
+
+	def advance(self, ms: int) -> int:
+		with self._lock:
+			self.now_ms += int(ms)
+			return self.now_ms
+
+	def finished(self) -> bool:
+		return all(self.server_time() >= int(c[-1]) for c in self._close_ms.values())
+
+	def _cursor(self, symbol: str) -> int:
+		"""Index of the last closed base bar at the current sim time."""
+		idx = int(np.searchsorted(self._close_ms[symbol], self.server_time(), side="right")) - 1
+		if idx < 0:
+			raise SimError(-1121, f"No data for {symbol} yet.")
+		return idx
+
+	def last_price(self, symbol: str) -> Decimal:
+		return Decimal(self._raw[symbol][self._cursor(symbol)][4])
+
+	# -------- Market data --------
+	def klines(self, params: Dict[str, str]) -> List[List[Any]]:
+		"""Closed bars plus the forming one, like Binance.
+
+		The forming bar only aggregates base bars that have already closed at
+		the sim time (a flat bar at the last price before the first of them),
+		for the base interval and derived intervals alike.
+		"""
+		sym = self._symbol(params)
+		interval = params.get("interval", "")
+		if interval not in INTERVAL_MS:
+			raise SimError(-1120, "Invalid interval.")
+		limit = min(int(params.get("limit", 500)), 1500)
+		now = self.server_time()
+		if interval == sym.base_interval:
+			rows, closes = self._raw[sym.symbol], self._close_ms[sym.symbol]
+			end = self._cursor(sym.symbol) + 1
+		else:
+			if sym.base_interval != "1m":
+				raise SimError(-1120, f"Only {sym.base_interval} (or intervals derived from 1m) available.")
+			key = (sym.symbol, interval)
+			if key not in self._resampled:
+				resampled = _to_raw(resample_klines(sym.bars, interval), interval)
+				self._resampled[key] = (resampled, np.array([r[0] for r in resampled], dtype=np.int64))
+			rows, opens = self._resampled[key]
+			closes = opens + INTERVAL_MS[interval] - 1
+			end = int(np.searchsorted(closes, now, side="right"))
+		# 当前时间落在下一根 K 线内：附上未收盘的那根
+		forming = self._forming(sym, rows[end]) if end < len(rows) and rows[end][0] <= now else None
+		if "endTime" in params:
+			end_time = int(params["endTime"])
+			end = min(end, int(np.searchsorted(closes, end_time, side="right")))
+			if forming is not None and forming[6] > end_time:
+				forming = None
+		if forming is None:
+			return rows[max(0, end - limit):end]
+		return rows[max(0, end - limit + 1):end] + [forming]
+
+	def _forming(self, sym: SimSymbol, row: List[Any]) -> List[Any]:
+		base = self._raw[sym.symbol]
+		lo = int(np.searchsorted(self._close_ms[sym.symbol], row[0], side="left"))
+		hi = self._cursor(sym.symbol) + 1
+		part = base[lo:hi]
+		if not part:
+			last = base[hi - 1][4]
+			return [row[0], last, last, last, last, "0", row[6], "0", 0, "0", "0", "0"]
+		return [
+			row[0],
+			part[0][1],
+			str(max(float(r[2]) for r in part)),
+			str(min(float(r[3]) for r in part)),
+			part[-1][4],
+			str(sum(float(r[5]) for r in part)),
+			row[6],
+			"0",
+			0,
+			"0",
+			"0",
+			"0",
+		]
+
+	def exchange_info(self, futures: bool) -> Dict[str, Any]:
+		symbols = []
+		for s in self.symbols.values():
+			notional = {"filterType": "MIN_NOTIONAL", "notional": s.min_notional} if futures else {"filterType": "MIN_NOTIONAL", "minNotional": s.min_notional}
+			entry: Dict[str, Any] = {
+				"symbol": s.symbol,
+				"status": "TRADING",
+				"baseAsset": s.base_asset,
+				"quoteAsset": s.quote_asset,
+				"filters": [
+					{"filterType": "PRICE_FILTER", "tickSize": s.tick_size, "minPrice": s.tick_size, "maxPrice": "10000000"},
+					{"filterType": "LOT_SIZE", "stepSize": s.step_size, "minQty": s.min_qty, "maxQty": "100000000"},
+					notional,
+				],
+			}
+			if futures:
+				entry["contractType"] = "PERPETUAL"
+			symbols.append(entry)
+		return {"timezone": "UTC", "serverTime": self.server_time(), "symbols": symbols}
+
+	# -------- Trading --------
+	def _symbol(self, params: Dict[str, str]) -> SimSymbol:
+		name = params.get("symbol")
+		if not name:
+			raise SimError(-1102, "Mandatory parameter 'symbol' was not sent, was empty/null, or malformed.")
+		if name not in self.symbols:
+			raise SimError(-1121, "Invalid symbol.")
+		return self.symbols[name]
+
+	def _next_order_id(self) -> int:
+		self.order_count += 1
+		return self.order_count
+
+	def _fill_price(self, symbol: str, side: str) -> Decimal:
+		price = self.last_price(symbol)
+		slip = self.slippage if side == "BUY" else -self.slippage
+		return price * (Decimal("1") + slip)
+
+	def _check_qty(self, sym: SimSymbol, qty: Decimal, price: Decimal, check_notional: bool = True) -> None:
+		step = Decimal(sym.step_size)
+		if qty <= 0 or qty % step != 0:
+			raise SimError(-1111, "Precision is over the maximum defined for this asset.")
+		if qty < Decimal(sym.min_qty):
+			raise SimError(-1013, "Filter failure: LOT_SIZE")
+		if check_notional and qty * price < Decimal(sym.min_notional):
+			raise SimError(-4164, f"Order's notional must be no smaller than {sym.min_notional}")
+
+	def change_leverage(self, params: Dict[str, str]) -> Dict[str, Any]:
+		sym = self._symbol(params)
+		lev = int(params.get("leverage", 0))
+		if not 1 <= lev <= 125:
+			raise SimError(-4028, "Leverage is not valid.")
+		self.account.positions.setdefault(sym.symbol, FuturesPosition()).leverage = lev
+		return {"symbol": sym.symbol, "leverage": lev, "maxNotionalValue": "1000000"}
+
+	def futures_order(self, params: Dict[str, str]) -> Dict[str, Any]:
+		sym = self._symbol(params)
+		side = params.get("side", "").upper()
+		if side not in {"BUY", "SELL"}:
+			raise SimError(-1102, "Mandatory parameter 'side' was not sent, was empty/null, or malformed.")
+		if params.get("type", "").upper() != "MARKET":
+			raise SimError(-1116, "Invalid orderType; simulator supports MARKET only.")
+		qty = Decimal(params.get("quantity", "0"))
+		reduce_only = params.get("reduceOnly", "false").lower() == "true"
+		pos = self.account.positions.setdefault(sym.symbol, FuturesPosition())
+		price = self._fill_price(sym.symbol, side)
+		signed = qty if side == "BUY" else -qty
+
+		if reduce_only:
+			if pos.amount == 0 or (pos.amount > 0) == (signed > 0):
+				raise SimError(-2022, "ReduceOnly Order is rejected.")
+			qty = min(qty, abs(pos.amount))
+			signed = qty if side == "BUY" else -qty
+		self._check_qty(sym, qty, price, check_notional=not reduce_only)
+
+		notional = qty * price
+		fee = notional * self.fee
+		realized = Decimal("0")
+		if pos.amount != 0 and (pos.amount > 0) != (signed > 0):
+			closed = min(abs(signed), abs(pos.amount))
+			direction = Decimal("1") if pos.amount > 0 else Decimal("-1")
+			realized = (price - pos.entry_price) * closed * direction
+		new_amount = pos.amount + signed
+		entry = pos.entry_price
+		if new_amount == 0:
+			entry = Decimal("0")
+		elif pos.amount == 0 or (pos.amount > 0) == (signed > 0):
+			# 加仓：按成交量加权计算开仓均价
+			entry = (pos.entry_price * abs(pos.amount) + price * abs(signed)) / abs(new_amount)
+		elif (new_amount > 0) != (pos.amount > 0):
+			# 反手：剩余部分以成交价开新仓
+			entry = price
+
+		if abs(new_amount) > abs(pos.amount):
+			margin_needed = abs(new_amount) * price / Decimal(pos.leverage)
+			if margin_needed > self._available_futures() + self._position_margin(sym.symbol):
+				raise SimError(-2019, "Margin is insufficient.")
+
+		pos.entry_price = entry
+		pos.amount = new_amount
+		self.account.futures_wallet += realized - fee
+		return {
+			"orderId": self._next_order_id(),
+			"symbol": sym.symbol,
+			"status": "FILLED",
+			"side": side,
+			"type": "MARKET",
+			"reduceOnly": reduce_only,
+			"origQty": str(qty),
+			"executedQty": str(qty),
+			"avgPrice": str(price),
+			"cumQuote": str(notional),
+			"updateTime": self.server_time(),
+		}
+
+	def _position_margin(self, symbol: str) -> Decimal:
+		pos = self.account.positions.get(symbol)
+		if pos is None or pos.amount == 0:
+			return Decimal("0")
+		return abs(pos.amount) * self.last_price(symbol) / Decimal(pos.leverage)
+
+	def _unrealized(self, symbol: str) -> Decimal:
+		pos = self.account.positions.get(symbol)
+		if pos is None or pos.amount == 0:
+			return Decimal("0")
+		return (self.last_price(symbol) - pos.entry_price) * pos.amount
+
+	def _available_futures(self) -> Decimal:
+		used = sum((self._position_margin(s) for s in self.account.positions), Decimal("0"))
+		upnl = sum((self._unrealized(s) for s in self.account.positions), Decimal("0"))
+		return self.account.futures_wallet + upnl - used
+
+	def futures_account(self) -> Dict[str, Any]:
+		upnl = sum((self._unrealized(s) for s in self.account.positions), Decimal("0"))
+		return {
+			"totalWalletBalance": str(self.account.futures_wallet),
+			"totalUnrealizedProfit": str(upnl),
+			"totalMarginBalance": str(self.account.futures_wallet + upnl),
+			"availableBalance": str(self._available_futures()),
+			"assets": [{"asset": "USDT", "walletBalance": str(self.account.futures_wallet), "unrealizedProfit": str(upnl)}],
+			"positions": [
+				{
+					"symbol": s,
+					"positionAmt": str(p.amount),
+					"entryPrice": str(p.entry_price),
+					"leverage": str(p.leverage),
+					"unrealizedProfit": str(self._unrealized(s)),
+				}
+				for s, p in self.account.positions.items()
+			],
+		}
+
+	def spot_order(self, params: Dict[str, str]) -> Dict[str, Any]:
+		sym = self._symbol(params)
+		side = params.get("side", "").upper()
+		if side not in {"BUY", "SELL"}:
+			raise SimError(-1102, "Mandatory parameter 'side' was not sent, was empty/null, or malformed.")
+		if params.get("type", "").upper() != "MARKET":
+			raise SimError(-1116, "Invalid orderType; simulator supports MARKET only.")
+		price = self._fill_price(sym.symbol, side)
+		step = Decimal(sym.step_size)
+		if "quoteOrderQty" in params:
+			qty = (Decimal(params["quoteOrderQty"]) / price // step) * step
+		else:
+			qty = Decimal(params.get("quantity", "0"))
+		try:
+			self._check_qty(sym, qty, price)
+		except SimError as exc:
+			raise SimError(-1013, f"Filter failure: {exc.msg}") from exc
+
+		balances = self.account.spot_balances
+		notional = qty * price
+		base, quote = sym.base_asset, sym.quote_asset
+		if side == "BUY":
+			if balances.get(quote, Decimal("0")) < notional:
+				raise SimError(-2010, "Account has insufficient balance for requested action.")
+			commission, commission_asset = qty * self.fee, base
+			balances[quote] = balances.get(quote, Decimal("0")) - notional
+			balances[base] = balances.get(base, Decimal("0")) + qty - commission
+		else:
+			if balances.get(base, Decimal("0")) < qty:
+				raise SimError(-2010, "Account has insufficient balance for requested action.")
+			commission, commission_asset = notional * self.fee, quote
+			balances[base] = balances.get(base, Decimal("0")) - qty
+			balances[quote] = balances.get(quote, Decimal("0")) + notional - commission
+		return {
+			"symbol": sym.symbol,
+			"orderId": self._next_order_id(),
+			"transactTime": self.server_time(),
+			"status": "FILLED",
+			"type": "MARKET",
+			"side": side,
+			"origQty": str(qty),
+			"executedQty": str(qty),
+			"cummulativeQuoteQty": str(notional),
+			"fills": [{"price": str(price), "qty": str(qty), "commission": str(commission), "commissionAsset": commission_asset}],
+		}
+
+	def spot_account(self) -> Dict[str, Any]:
+		return {
+			"canTrade": True,
+			"balances": [{"asset": a, "free": str(v), "locked": "0"} for a, v in self.account.spot_balances.items()],
+		}
+
+	# -------- Routing --------
+	def dispatch(self, method: str, path: str, params: Dict[str, str], headers: Dict[str, str]) -> Any:
+		route = _ROUTES.get((method, path))
+		if route is None:
+			raise SimError(-1000, f"Unsupported endpoint {method} {path}", status=404)
+		name, signed = route
+		if signed and not headers.get("x-mbx-apikey"):
+			raise SimError(-2014, "API-key format invalid.", status=401)
+		with self._lock:
+			if name == "time":
+				return {"serverTime": self.server_time()}
+			if name == "klines":
+				return self.klines(params)
+			if name == "fapi_info":
+				return self.exchange_info(futures=True)
+			if name == "spot_info":
+				return self.exchange_info(futures=False)
+			if name == "price":
+				sym = self._symbol(params)
+				return {"symbol": sym.symbol, "price": str(self.last_price(sym.symbol))}
+			if name == "leverage":
+				return self.change_leverage(params)
+			if name == "fapi_order":
+				return self.futures_order(params)
+			if name == "fapi_account":
+				return self.futures_account()
+			if name == "spot_order":
+				return self.spot_order(params)
+			return self.spot_account()
+
+	def call(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Any:
+		"""In-process equivalent of one HTTP request; raises ``SimError`` on rejection."""
+		params = {k: str(v) for k, v in (params or {}).items()}
+		return self.dispatch(method, path, params, {"x-mbx-apikey": "sim"} if signed else {})
+
+	# -------- HTTP --------
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		try:
+			while True:
+				try:
+					head = await reader.readuntil(b"\r\n\r\n")
+				except asyncio.IncompleteReadError:
+					break
+				lines = head.decode("latin-1").split("\r\n")
+				method, target, _ = lines[0].split(" ", 2)
+				headers = {}
+				for line in lines[1:]:
+					if ":" in line:
+						k, v = line.split(":", 1)
+						headers[k.strip().lower()] = v.strip()
+				body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+				url = urlsplit(target)
+				params = dict(parse_qsl(url.query))
+				params.update(parse_qsl(body.decode()))
+				try:
+					status, payload = 200, self.dispatch(method.upper(), url.path, params, headers)
+				except SimError as exc:
+					status, payload = exc.status, {"code": exc.code, "msg": exc.msg}
+				except (KeyError, ValueError, ArithmeticError) as exc:
+					status, payload = 400, {"code": -1100, "msg": f"Illegal parameters: {exc}"}
+				data = json.dumps(payload, separators=(",", ":")).encode()
+				keep_alive = headers.get("connection", "").lower() != "close"
+				writer.write(
+					(
+						f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+						"Content-Type: application/json\r\n"
+						f"Content-Length: {len(data)}\r\n"
+						f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+					).encode()
+					+ data
+				)
+				await writer.drain()
+				if not keep_alive:
+					break
+		except (ConnectionError, ValueError):
+			pass
+		finally:
+			writer.close()
+
+	async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+		return await asyncio.start_server(self.handle, host, port)
+
+	def serve_in_thread(self, host: str = DEFAULT_HOST, port: int = 0) -> str:
+		"""Run the HTTP front-end on a daemon thread and return its base URL."""
+		ready = threading.Event()
+		bound: Dict[str, int] = {}
+
+		def _run() -> None:
+			async def _main() -> None:
+				server = await self.serve(host, port)
+				bound["port"] = server.sockets[0].getsockname()[1]
+				ready.set()
+				async with server:
+					await server.serve_forever()
+
+			asyncio.run(_main())
+
+		threading.Thread(target=_run, name="exchange-sim", daemon=True).start()
+		ready.wait()
+		return f"http://{host}:{bound['port']}"
+
+
+_ROUTES: Dict[Tuple[str, str], Tuple[str, bool]] = {
+	("GET", "/fapi/v1/time"): ("time", False),
+	("GET", "/api/v3/time"): ("time", False),
+	("GET", "/fapi/v1/klines"): ("klines", False),
+	("GET", "/api/v3/klines"): ("klines", False),
+	("GET", "/fapi/v1/exchangeInfo"): ("fapi_info", False),
+	("GET", "/api/v3/exchangeInfo"): ("spot_info", False),
+	("GET", "/fapi/v1/ticker/price"): ("price", False),
+	("GET", "/api/v3/ticker/price"): ("price", False),
+	("POST", "/fapi/v1/leverage"): ("leverage", True),
+	("POST", "/fapi/v1/order"): ("fapi_order", True),
+	("GET", "/fapi/v2/account"): ("fapi_account", True),
+	("POST", "/api/v3/order"): ("spot_order", True),
+	("GET", "/api/v3/account"): ("spot_account", True),
+}
+
+
+def _to_raw(bars: pd.DataFrame, interval: str) -> List[List[Any]]:
+	"""Convert a ``fetch_klines_df``-shaped frame back into Binance kline rows."""
+	close_ms = np.asarray(bars.index.values).astype("datetime64[ms]").astype(np.int64)
+	open_ms = close_ms + 1 - INTERVAL_MS[interval]
+	cols = [bars[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume")]
+	return [
+		[int(o), str(op), str(hi), str(lo), str(cl), str(vo), int(c), str(cl * vo), 0, "0", "0", "0"]
+		for o, c, op, hi, lo, cl, vo in zip(open_ms, close_ms, *cols)
+	]
+
+
+def run_sim_server(sim: ExchangeSimulator, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+	async def _main() -> None:
+		server = await sim.serve(host, port)
+		print(f"Exchange simulator listening on http://{host}:{port}")
+		async with server:
+			await server.serve_forever()
+
+	asyncio.run(_main())
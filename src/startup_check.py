@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# 定时运行的交易命令需要的模块；这些入口不应加载下列重依赖
+DEFAULT_TARGETS = ["src.main", "src.live.futures_trader", "src.live.state", "src.bus.client"]
+FORBIDDEN = ["pandas", "numpy", "binance", "pydantic", "plotly", "streamlit", "dotenv"]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(targets: List[str]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Run ``python -X importtime`` on ``targets``; return (self_us, cumulative_us) per top-level import."""
+    code = "import " + ", ".join(targets)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    self_us: Dict[str, int] = {}
+    cumulative_us: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        name = m.group(4)
+        self_us[name] = int(m.group(1))
+        # 缩进为 1 的是顶层导入，累计时间相加即总导入耗时
+        if len(m.group(3)) == 1:
+            cumulative_us[name] = int(m.group(2))
+    return self_us, cumulative_us
+
+
+def forbidden_imports(self_us: Dict[str, int]) -> List[str]:
+    """Top-level packages from ``FORBIDDEN`` that appear in a ``measure`` result."""
+    return sorted({n.split(".")[0] for n in self_us} & set(FORBIDDEN))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check CLI import time and forbidden heavy imports")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when total import time exceeds this")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    self_us, cumulative_us = measure(args.targets)
+    total_ms = sum(cumulative_us.values()) / 1000.0
+    print(f"Total import time: {total_ms:.1f} ms ({len(self_us)} modules)")
+    for name, us in sorted(self_us.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"- {name}: {us / 1000.0:.1f} ms")
+
+    failed = False
+    heavy = forbidden_imports(self_us)
+    if heavy:
+        print(f"FAIL: heavy modules imported: {', '.join(heavy)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"FAIL: {total_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
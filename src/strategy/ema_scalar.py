@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+
+class EmaState:
+    """Streaming ``ewm(span=span, adjust=False)``: one ``update`` per new value."""
+
+    __slots__ = ("alpha", "old_wt", "value")
+
+    def __init__(self, span: int) -> None:
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt = 1.0 - self.alpha
+        self.value = float("nan")
+
+    def update(self, cur: float) -> float:
+        weighted = self.value
+        if weighted != weighted:
+            weighted = cur
+        elif cur == cur and weighted != cur:
+            weighted = (self.old_wt * weighted + self.alpha * cur) / (self.old_wt + self.alpha)
+        self.value = weighted
+        return weighted
+
+
+def ema_values(values: Sequence[float], span: int) -> List[float]:
+    """Pure-Python ``Series.ewm(span=span, adjust=False).mean()``.
+
+    Follows pandas' update order so results are bit-identical, letting
+    short-lived trader runs skip importing pandas/numpy altogether.
+    """
+    state = EmaState(span)
+    return [state.update(cur) for cur in values]
+
+
+def last_ema_cross(closes: Sequence[float], fast: int = 12, slow: int = 26) -> Tuple[int, int]:
+    """Latest ``(cross, signal)`` as ``add_ema_features`` would report them."""
+    f = ema_values(closes, fast)
+    s = ema_values(closes, slow)
+
+    def signal(i: int) -> int:
+        return 1 if f[i] > s[i] else -1 if f[i] < s[i] else 0
+
+    last = signal(-1)
+    prev = signal(-2) if len(closes) > 1 else last
+    return last - prev, last
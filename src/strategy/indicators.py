@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import pandas as pd
 
+from src.strategy.pipeline import bollinger, compute_features
+
 
 def compute_bollinger_bands(
     df: pd.DataFrame,
@@ -9,19 +11,8 @@ def compute_bollinger_bands(
     std_multiplier: float = 2.0,
 ) -> pd.DataFrame:
     out = df.copy()
-    mid = out["close"].rolling(window=period, min_periods=period).mean()
-    std = out["close"].rolling(window=period, min_periods=period).std(ddof=0)
-    upper = mid + std_multiplier * std
-    lower = mid - std_multiplier * std
-
-    out["bb_mid"] = mid
-    out["bb_upper"] = upper
-    out["bb_lower"] = lower
-
-    # Bandwidth and %B for additional diagnostics
-    band_width = (upper - lower) / out["close"]
-    percent_b = (out["close"] - lower) / (upper - lower)
-
-    out["bb_bandwidth"] = band_width
-    out["bb_percent_b"] = percent_b
-    return out 
\ No newline at end of file
+    # Mid/upper/lower plus bandwidth and %B for additional diagnostics
+    feats = compute_features(df, bollinger(period, std_multiplier))
+    for col in feats.columns:
+        out[col] = feats[col]
+    return out
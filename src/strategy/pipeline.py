@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+Key = Tuple[Hashable, ...]
+
+
+@dataclass(frozen=True)
+class Node:
+    """One step of the indicator DAG.
+
+    ``key`` identifies the computation (kind + inputs + params); nodes with the
+    same key are computed once and shared by every consumer. ``name`` is the
+    output column, or ``None`` for intermediates that are not exposed.
+    """
+
+    key: Key
+    deps: Tuple[Key, ...]
+    fn: Callable[..., np.ndarray]
+    name: str | None = None
+
+
+def source(column: str) -> Key:
+    return ("col", column)
+
+
+# ---------- Kernels ----------
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    return pd.Series(x, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def _sma(x: np.ndarray, period: int) -> np.ndarray:
+    return pd.Series(x, copy=False).rolling(window=period, min_periods=period).mean().to_numpy()
+
+
+def _std(x: np.ndarray, period: int) -> np.ndarray:
+    return pd.Series(x, copy=False).rolling(window=period, min_periods=period).std(ddof=0).to_numpy()
+
+
+def _signal(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    return np.where(fast > slow, 1, np.where(fast < slow, -1, 0)).astype(np.int64)
+
+
+def _cross(signal: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(signal), dtype=float)
+    out[1:] = np.diff(signal)
+    return out
+
+
+# ---------- Node factories ----------
+def ema(span: int, column: str = "close", name: str | None = None) -> Node:
+    return Node(("ema", column, span), (source(column),), lambda x: _ema(x, span), name)
+
+
+def sma(period: int, column: str = "close", name: str | None = None) -> Node:
+    return Node(("sma", column, period), (source(column),), lambda x: _sma(x, period), name)
+
+
+def rolling_std(period: int, column: str = "close", name: str | None = None) -> Node:
+    return Node(("std", column, period), (source(column),), lambda x: _std(x, period), name)
+
+
+def ema_cross(fast: int = 12, slow: int = 26) -> List[Node]:
+    f, s = ema(fast, name=f"ema_{fast}"), ema(slow, name=f"ema_{slow}")
+    sig = Node(("signal", fast, slow), (f.key, s.key), _signal, "signal")
+    cross = Node(("cross", fast, slow), (sig.key,), _cross, "cross")
+    return [f, s, sig, cross]
+
+
+def bollinger(period: int = 20, std_multiplier: float = 2.0) -> List[Node]:
+    mid = sma(period, name="bb_mid")
+    std = rolling_std(period)
+    upper = Node(("bb_upper", period, std_multiplier), (mid.key, std.key), lambda m, s: m + std_multiplier * s, "bb_upper")
+    lower = Node(("bb_lower", period, std_multiplier), (mid.key, std.key), lambda m, s: m - std_multiplier * s, "bb_lower")
+    close = source("close")
+    width = Node(("bb_bandwidth", period, std_multiplier), (upper.key, lower.key, close), lambda u, l, c: (u - l) / c, "bb_bandwidth")
+    pct_b = Node(("bb_percent_b", period, std_multiplier), (upper.key, lower.key, close), lambda u, l, c: (c - l) / (u - l), "bb_percent_b")
+    return [mid, std, upper, lower, width, pct_b]
+
+
+# ---------- Cache ----------
+class FeatureCache:
+    """Computed feature arrays keyed by (data version, node key).
+
+    Only the most recent ``max_versions`` data versions are retained, which is
+    enough for a live loop where every refresh produces a new version.
+    """
+
+    def __init__(self, max_versions: int = 8) -> None:
+        self.max_versions = max_versions
+        self._store: "OrderedDict[Hashable, Dict[Key, np.ndarray]]" = OrderedDict()
+
+    def bucket(self, version: Hashable) -> Dict[Key, np.ndarray]:
+        if version in self._store:
+            self._store.move_to_end(version)
+            return self._store[version]
+        bucket: Dict[Key, np.ndarray] = {}
+        self._store[version] = bucket
+        while len(self._store) > self.max_versions:
+            self._store.popitem(last=False)
+        return bucket
+
+    def clear(self) -> None:
+        self._store.clear()
+
+
+default_cache = FeatureCache()
+
+
+def _frame_bounds(df: pd.DataFrame) -> Hashable:
+    if df.empty:
+        return (0,)
+    return (len(df), df.index[0], df.index[-1])
+
+
+def data_version(df: pd.DataFrame) -> Hashable:
+    """Cheap fingerprint of an OHLCV frame: shape, bounds and column checksums.
+
+    Callers that track their own revisions can set ``df.attrs["version"]``;
+    it is combined with the frame's length and index bounds, since pandas
+    copies ``attrs`` onto slices of the frame.
+    """
+    if "version" in df.attrs:
+        return (df.attrs["version"], _frame_bounds(df))
+    if df.empty:
+        return (0,)
+    cols = [c for c in ("open", "high", "low", "close", "volume") if c in df.columns]
+    sums = tuple(float(np.nansum(df[c].to_numpy())) for c in cols)
+    last = tuple(float(df[c].iat[-1]) for c in cols)
+    return (len(df), df.index[0], df.index[-1], sums, last)
+
+
+# ---------- Pipeline ----------
+def compute_features(
+    df: pd.DataFrame,
+    nodes: Iterable[Node],
+    cache: FeatureCache | None = default_cache,
+    version: Hashable | None = None,
+) -> pd.DataFrame:
+    """Evaluate ``nodes`` over ``df`` and return only the named feature columns.
+
+    OHLCV columns are read in place (no frame copy); shared intermediates are
+    computed once, and results are memoized in ``cache`` per data version.
+    """
+    graph: Dict[Key, Node] = {}
+    for node in nodes:
+        known = graph.get(node.key)
+        if known is None or (known.name is None and node.name):
+            graph[node.key] = node
+
+    memo: Dict[Key, np.ndarray]
+    if cache is None:
+        memo = {}
+    else:
+        memo = cache.bucket((version, _frame_bounds(df)) if version is not None else data_version(df))
+
+    def resolve(key: Key) -> np.ndarray:
+        if key in memo:
+            return memo[key]
+        if key[0] == "col":
+            return df[key[1]].to_numpy(dtype=float)
+        node = graph[key]
+        memo[key] = node.fn(*(resolve(d) for d in node.deps))
+        return memo[key]
+
+    columns = {node.name: resolve(node.key) for node in graph.values() if node.name}
+    return pd.DataFrame(columns, index=df.index)
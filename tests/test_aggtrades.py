@@ -0,0 +1,58 @@
+import hashlib
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.data.aggtrades import iter_aggtrades_csv, iter_ticks, write_tick_file
+
+USDM_HEADER = "agg_trade_id,price,quantity,first_trade_id,last_trade_id,transact_time,is_buyer_maker"
+TRADES = [
+    # (price, qty, time ms, buyer is maker)
+    (42000.1, 0.5, 1704067200001, True),
+    (42000.2, 0.25, 1704067200500, False),
+    (41999.9, 1.0, 1704067261000, True),
+]
+
+
+def _zip(path: Path, lines) -> Path:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(path.with_suffix(".csv").name, "\n".join(lines) + "\n")
+    Path(f"{path}.CHECKSUM").write_text(f"{hashlib.sha256(path.read_bytes()).hexdigest()}  {path.name}\n")
+    return path
+
+
+def _usdm(tmp_path: Path) -> Path:
+    rows = [f"{i},{p},{q},{i},{i},{t},{str(m).lower()}" for i, (p, q, t, m) in enumerate(TRADES)]
+    return _zip(tmp_path / "BTCUSDT-aggTrades-2024-01-01.zip", [USDM_HEADER] + rows)
+
+
+def _spot(tmp_path: Path, micros: bool = False) -> Path:
+    # 现货：无表头、多一列 is_best_match，2025 年起为微秒时间戳
+    rows = [f"{i},{p},{q},{i},{i},{t * 1000 if micros else t},{m},True" for i, (p, q, t, m) in enumerate(TRADES)]
+    return _zip(tmp_path / "BTCUSDT-aggTrades-2024-01-02.zip", rows)
+
+
+def _assert_trades(chunks):
+    time = np.concatenate([c.time for c in chunks])
+    np.testing.assert_array_equal(time, [t for _, _, t, _ in TRADES])
+    np.testing.assert_array_equal(np.concatenate([c.price for c in chunks]), [p for p, _, _, _ in TRADES])
+    np.testing.assert_array_equal(np.concatenate([c.qty for c in chunks]), [q for _, q, _, _ in TRADES])
+    np.testing.assert_array_equal(np.concatenate([c.buyer_maker for c in chunks]), [m for _, _, _, m in TRADES])
+    assert time.dtype == np.int64
+
+
+@pytest.mark.parametrize("layout", ["usdm", "spot", "spot_micros"])
+def test_parses_usdm_and_spot_layouts(tmp_path, layout):
+    archive = _usdm(tmp_path) if layout == "usdm" else _spot(tmp_path, micros=layout == "spot_micros")
+
+    _assert_trades(list(iter_aggtrades_csv(archive, chunksize=2, verify=True)))
+
+
+def test_tick_file_round_trip(tmp_path):
+    out = tmp_path / "ticks.bin"
+
+    assert write_tick_file([_usdm(tmp_path)], out) == len(TRADES)
+
+    _assert_trades(list(iter_ticks([out], chunksize=2)))
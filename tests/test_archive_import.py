@@ -0,0 +1,100 @@
+import hashlib
+import shutil
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data.archive_import import (
+    OHLCV,
+    export_archives,
+    find_archives,
+    import_archives,
+    read_archive,
+    verify_checksum,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "klines"
+MONTHLY = FIXTURES / "BTCUSDT-1m-2024-01.zip"
+
+
+def _write_archive(path: Path, lines) -> Path:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(path.with_suffix(".csv").name, "\n".join(lines) + "\n")
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    Path(f"{path}.CHECKSUM").write_text(f"{digest}  {path.name}\n")
+    return path
+
+
+def _csv_lines(archive: Path):
+    with zipfile.ZipFile(archive) as zf:
+        return zf.read(zf.namelist()[0]).decode().splitlines()
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    """The monthly fixture plus an overlapping, headerless (spot-style) daily archive."""
+    shutil.copy(MONTHLY, tmp_path)
+    shutil.copy(f"{MONTHLY}.CHECKSUM", tmp_path)
+    day2 = [line for line in _csv_lines(MONTHLY)[1:] if int(line.split(",")[0]) >= 1704153600000]
+    _write_archive(tmp_path / "BTCUSDT-1m-2024-01-02.zip", day2)
+    return tmp_path
+
+
+def test_read_archive_matches_fetch_klines_layout():
+    df = read_archive(MONTHLY)
+
+    assert list(df.columns) == OHLCV
+    assert df.index.name == "close_time"
+    assert df.index[0] == pd.Timestamp("2024-01-01 00:00:59.999")
+    assert len(df) == 2 * 1440 and df.index.is_monotonic_increasing
+    assert (df.dtypes == float).all()
+
+
+def test_checksum_mismatch_is_rejected(tmp_path):
+    archive = tmp_path / MONTHLY.name
+    shutil.copy(MONTHLY, archive)
+    Path(f"{archive}.CHECKSUM").write_text("0" * 64 + f"  {archive.name}\n")
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        verify_checksum(archive)
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        export_archives([archive], tmp_path / "out.csv", workers=1)
+
+
+def test_microsecond_timestamps_are_normalised(tmp_path):
+    lines = []
+    for line in _csv_lines(MONTHLY)[1:4]:
+        fields = line.split(",")
+        fields[0] += "000"
+        fields[6] += "000"
+        lines.append(",".join(fields))
+    archive = _write_archive(tmp_path / "BTCUSDT-1m-2025-01-01.zip", lines)
+
+    pd.testing.assert_frame_equal(read_archive(archive), read_archive(MONTHLY).iloc[:3])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_export_streams_same_bars_as_in_memory_import(archive_dir, tmp_path, workers):
+    archives = find_archives(archive_dir, symbol="BTCUSDT", interval="1m")
+    out = tmp_path / "bars.csv"
+
+    summary = export_archives(archives, out, workers=workers, chunksize=500)
+
+    expected = import_archives(archives, workers=1)
+    assert summary["bars"] == len(expected) == 2 * 1440
+    assert summary["start"] == expected.index[0] and summary["end"] == expected.index[-1]
+    written = pd.read_csv(out, index_col="close_time", parse_dates=["close_time"])
+    pd.testing.assert_frame_equal(written, expected, check_freq=False)
+
+
+def test_find_archives_skips_trade_dumps_in_the_same_directory(archive_dir):
+    trades = ["1,42000.1,0.5,1,1,1704067200001,true"]
+    _write_archive(archive_dir / "BTCUSDT-aggTrades-2024-01-01.zip", trades)
+    _write_archive(archive_dir / "BTCUSDT-trades-2024-01-01.zip", trades)
+
+    found = find_archives(archive_dir)
+
+    assert [p.name for p in found] == ["BTCUSDT-1m-2024-01-02.zip", "BTCUSDT-1m-2024-01.zip"]
+    assert export_archives(found, None, workers=1)["bars"] == 2 * 1440
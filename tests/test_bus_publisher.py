@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from src.bus.publisher import MarketDataPublisher
+from src.bus.ring import RingReader, ring_path
+
+MINUTE_MS = 60_000
+T0_MS = 1_704_067_200_000
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = T0_MS / 1000 + 600.5
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeUSDMClient:
+    """Serves the latest ``limit`` 1m bars (forming bar included) as of the shared clock."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.down = False
+        self.limits = []
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500):
+        if self.down:
+            raise RuntimeError("upstream unavailable")
+        self.limits.append(limit)
+        now_ms = int(self.clock() * 1000)
+        last_open = now_ms - now_ms % MINUTE_MS
+        rows = []
+        for open_ms in range(last_open - (limit - 1) * MINUTE_MS, last_open + 1, MINUTE_MS):
+            price = 100.0 + (open_ms - T0_MS) / MINUTE_MS
+            rows.append([open_ms, price, price + 1, price - 1, price + 0.5, 1.0, open_ms + MINUTE_MS - 1, 0, 0, 0, 0, 0])
+        return rows
+
+
+@pytest.fixture
+def feed(tmp_path):
+    clock = FakeClock()
+    client = FakeUSDMClient(clock)
+    publisher = MarketDataPublisher(client, tmp_path, ["BTCUSDT"], interval="1m", capacity=200, clock=clock)
+    yield clock, client, publisher, ring_path(tmp_path, "BTCUSDT", "1m")
+    publisher.close()
+
+
+def _assert_contiguous(path, upto_ms):
+    times = np.array(RingReader(path).times())
+    assert np.all(np.diff(times) == MINUTE_MS)
+    assert times[-1] == upto_ms - upto_ms % MINUTE_MS + MINUTE_MS - 1
+    closes = np.array(RingReader(path).column("close"))
+    np.testing.assert_array_equal(closes, 100.5 + (times + 1 - MINUTE_MS - T0_MS) / MINUTE_MS)
+
+
+def test_outage_is_backfilled_without_a_gap(feed):
+    clock, client, publisher, path = feed
+    publisher.publish_all()
+    for _ in range(3):
+        clock.now += 60
+        publisher.publish_all()
+    assert client.limits[1:] == [3, 3, 3]
+
+    client.down = True
+    for _ in range(20):
+        clock.now += 60
+        publisher.publish_all()
+    client.down = False
+    clock.now += 60
+    publisher.publish_all()
+
+    assert client.limits[-1] == 23
+    _assert_contiguous(path, int(clock.now * 1000))
+    assert len(RingReader(path).times()) == 200
+
+
+def test_outage_longer_than_window_rewrites_ring(feed):
+    clock, client, publisher, path = feed
+    publisher.publish_all()
+
+    clock.now += 500 * 60
+    publisher.publish_all()
+
+    assert client.limits[-1] == 200
+    _assert_contiguous(path, int(clock.now * 1000))
+
+
+def test_restarted_publisher_does_not_leave_gap_in_existing_ring(feed, tmp_path):
+    clock, client, publisher, path = feed
+    publisher.publish_all()
+    publisher.close()
+
+    clock.now += 300 * 60
+    restarted = MarketDataPublisher(client, tmp_path, ["BTCUSDT"], interval="1m", capacity=200, clock=clock)
+    try:
+        restarted.publish_all()
+    finally:
+        restarted.close()
+
+    _assert_contiguous(path, int(clock.now * 1000))
+
+
+def test_reader_serves_only_fresh_and_full_windows(feed):
+    clock, client, publisher, path = feed
+    publisher.publish_all()
+    reader = RingReader(path)
+    try:
+        n = min(reader.count, reader.capacity)
+        assert reader.serves(n, max_age=60)
+        assert not reader.serves(n + 1, max_age=60)
+        assert not reader.serves(n, max_age=-1)
+        assert len(reader.frame(n)) == n
+    finally:
+        reader.close()
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.downsample import downsample_ohlcv, downsample_series, lttb_indices
+
+
+def _bars(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(size=n))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = rng.uniform(0.0, 2.0, size=(2, n))
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + spread[0],
+            "low": np.minimum(open_, close) - spread[1],
+            "close": close,
+            "volume": rng.uniform(1.0, 10.0, n),
+        },
+        index=pd.date_range("2024-01-01 00:00:59.999", periods=n, freq="1min", name="close_time"),
+    )
+
+
+@pytest.mark.parametrize("n, budget", [(1000, 250), (1000, 333), (997, 7), (10, 9)])
+def test_buckets_keep_ohlcv_invariants(n, budget):
+    df = _bars(n)
+
+    out = downsample_ohlcv(df, budget)
+
+    assert len(out) <= budget and out.index.is_unique
+    assert out.index[-1] == df.index[-1]
+    # 每个桶覆盖上一个标签之后到本标签（含）的原始K线
+    bucket = np.searchsorted(out.index.values, df.index.values)
+    expected = df.groupby(bucket).agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    expected.index = df.index[df.groupby(bucket).cumcount(ascending=False).to_numpy() == 0]
+    pd.testing.assert_frame_equal(out[["open", "high", "low", "close"]], expected[["open", "high", "low", "close"]], check_freq=False)
+    np.testing.assert_allclose(out["volume"], expected["volume"], rtol=1e-12)
+    assert out["volume"].sum() == pytest.approx(df["volume"].sum())
+
+
+def test_ohlcv_is_noop_within_budget():
+    df = _bars(100)
+
+    assert downsample_ohlcv(df, 100) is df
+    assert downsample_ohlcv(df, 0) is df
+
+
+@pytest.mark.parametrize("n, threshold", [(1000, 100), (1000, 3), (101, 100), (5000, 977)])
+def test_lttb_keeps_endpoints_and_threshold_points(n, threshold):
+    y = np.sin(np.arange(n) / 20.0) + np.random.default_rng(1).normal(0.0, 0.1, n)
+
+    keep = lttb_indices(np.arange(n, dtype=float), y, threshold)
+
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_spikes():
+    y = np.zeros(1000)
+    y[[137, 512, 880]] = [5.0, -7.0, 3.0]
+
+    keep = lttb_indices(np.arange(1000, dtype=float), y, 50)
+
+    assert {137, 512, 880} <= set(keep.tolist())
+
+
+def test_lttb_is_noop_within_budget():
+    np.testing.assert_array_equal(lttb_indices(np.arange(10.0), np.arange(10.0), 10), np.arange(10))
+    np.testing.assert_array_equal(lttb_indices(np.arange(10.0), np.arange(10.0), 2), np.arange(10))
+    s = pd.Series(np.arange(10.0))
+    pd.testing.assert_series_equal(downsample_series(s, 10), s)
+
+
+def test_series_drops_nan_and_uses_time_axis():
+    s = _bars(2000)["close"]
+    s.iloc[:50] = np.nan
+
+    out = downsample_series(s, 200)
+
+    assert len(out) == 200
+    assert out.index[0] == s.index[50] and out.index[-1] == s.index[-1]
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.screener.ema_screener as ema_screener
+from src.screener.ema_screener import (
+    WeightBudget,
+    align_closes,
+    ema_2d,
+    fetch_universe,
+    klines_weight,
+    run_screener,
+    screen,
+)
+from src.strategy.ema_cross import add_ema_features
+
+HOUR_MS = 3_600_000
+N = 300
+
+
+def _klines(closes, end_bar: int = N):
+    start = end_bar - len(closes)
+    return [
+        [(start + i) * HOUR_MS, c, c, c, c, 1.0, (start + i + 1) * HOUR_MS - 1, 1000.0 * (i + 1), 1, 0, 0, 0]
+        for i, c in enumerate(closes)
+    ]
+
+
+class FakeClient:
+    """A few perpetuals with different histories; ``NEWUSDT`` listed 60 bars ago."""
+
+    def __init__(self) -> None:
+        t = np.arange(N)
+        self.series = {
+            "BTCUSDT": 100.0 + 10.0 * np.sin(t / 9.0),
+            "ETHUSDT": 50.0 + np.cumsum(np.random.default_rng(3).normal(size=N)),
+            "SOLUSDT": 20.0 + 0.01 * t,
+            "NEWUSDT": 1.0 + 0.2 * np.sin(np.arange(60) / 4.0),
+        }
+        self.calls = []
+
+    def get_exchange_info(self):
+        symbols = [{"symbol": s, "status": "TRADING", "contractType": "PERPETUAL", "quoteAsset": "USDT"} for s in self.series]
+        symbols.append({"symbol": "BTCUSD_PERP", "status": "TRADING", "contractType": "PERPETUAL", "quoteAsset": "USD"})
+        symbols.append({"symbol": "OLDUSDT", "status": "SETTLING", "contractType": "PERPETUAL", "quoteAsset": "USDT"})
+        return {"symbols": symbols}
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500):
+        self.calls.append((symbol, limit))
+        if symbol == "BADUSDT":
+            raise RuntimeError("Invalid symbol")
+        return _klines(self.series[symbol][-limit:].tolist())
+
+
+def _reference(closes: np.ndarray, fast: int, slow: int) -> pd.DataFrame:
+    df = pd.DataFrame({"close": closes}, index=pd.RangeIndex(len(closes)))
+    return add_ema_features(df, fast, slow)
+
+
+def _cross_age(signal: np.ndarray) -> int:
+    flips = np.flatnonzero((signal[1:] != signal[:-1]) & (signal[:-1] != 0)) + 1
+    return len(signal) - 1 - flips[-1] if len(flips) else -1
+
+
+def test_ema_2d_is_bit_identical_to_pandas_with_nan_padding():
+    x = np.random.default_rng(0).normal(size=(200, 5)).cumsum(axis=0) + 100.0
+    x[:37, 1] = np.nan
+    x[:199, 4] = np.nan
+
+    for span in (3, 12, 26):
+        expected = pd.DataFrame(x).ewm(span=span, adjust=False).mean().to_numpy()
+        np.testing.assert_array_equal(ema_2d(x, span), expected)
+
+
+def test_screen_matches_add_ema_features_per_column():
+    client = FakeClient()
+    _, names, close, _ = align_closes({s: client.get_klines(s, "1h", N) for s in client.series})
+
+    res = screen(close, fast=12, slow=26)
+
+    for j, name in enumerate(names):
+        closes = close[:, j][~np.isnan(close[:, j])]
+        ref = _reference(closes, 12, 26)
+        assert res["ema_fast"][j] == ref["ema_12"].iat[-1]
+        assert res["ema_slow"][j] == ref["ema_26"].iat[-1]
+        assert res["signal"][j] == ref["signal"].iat[-1]
+        assert res["cross_age"][j] == _cross_age(ref["signal"].to_numpy()), name
+
+
+def test_new_listing_is_nan_padded_and_aged_from_its_own_bars():
+    client = FakeClient()
+    times, names, close, _ = align_closes({s: client.get_klines(s, "1h", N) for s in ("BTCUSDT", "NEWUSDT")})
+
+    assert len(times) == N
+    assert np.isnan(close[: N - 60, 1]).all() and not np.isnan(close[N - 60 :, 1]).any()
+    age = screen(close, fast=3, slow=8)["cross_age"][1]
+    assert 0 <= age < 60
+    assert age == _cross_age(_reference(close[N - 60 :, 1], 3, 8)["signal"].to_numpy())
+
+
+def test_run_screener_filters_universe_and_sorts_fresh_crosses():
+    client = FakeClient()
+
+    table = run_screener(client, interval="1h", fast=3, slow=8, limit=N, max_age=N, workers=2)
+
+    assert {s for s, _ in client.calls} == set(client.series)
+    assert set(table["symbol"]) <= set(client.series)
+    assert "SOLUSDT" not in set(table["symbol"])  # 单边上涨，从未翻转
+    assert table["cross_age"].is_monotonic_increasing
+    assert table["side"].isin(["LONG", "SHORT"]).all()
+
+
+@pytest.mark.parametrize("limit, weight", [(1, 1), (99, 1), (100, 2), (499, 2), (500, 5), (1000, 5), (1001, 10), (1500, 10)])
+def test_klines_weight(limit, weight):
+    assert klines_weight(limit) == weight
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept += seconds
+        self.now += seconds
+
+
+def test_weight_budget_throttles_to_rate(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(ema_screener, "time", fake)
+    budget = WeightBudget(per_minute=60)
+
+    for _ in range(12):
+        budget.acquire(5)
+    assert fake.slept == 0.0
+
+    budget.acquire(5)
+    assert fake.slept == pytest.approx(5.0)
+    fake.now += 30.0
+    budget.acquire(30)
+    assert fake.slept == pytest.approx(5.0)
+
+
+def test_fetch_universe_charges_weight_and_skips_failures(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(ema_screener, "time", fake)
+    client = FakeClient()
+    budget = WeightBudget(per_minute=60)
+
+    raw = fetch_universe(client, ["BTCUSDT", "BADUSDT", "ETHUSDT"], "1h", limit=500, workers=1, budget=budget)
+
+    assert list(raw) == ["BTCUSDT", "ETHUSDT"]
+    assert budget.tokens == pytest.approx(60 - 3 * 5)
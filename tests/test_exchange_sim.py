@@ -0,0 +1,180 @@
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.sim.exchange_sim import ExchangeSimulator, SimError, SimSymbol
+from src.sim.replay import load_bars_csv, replay_futures_trader
+
+MINUTE_MS = 60_000
+
+
+def _bars(closes) -> pd.DataFrame:
+    closes = np.asarray(closes, dtype=float)
+    index = pd.date_range("2024-01-01 00:00:59.999", periods=len(closes), freq="1min", name="close_time")
+    return pd.DataFrame(
+        {
+            "open": np.r_[closes[0], closes[:-1]],
+            "high": closes + 0.5,
+            "low": closes - 0.5,
+            "close": closes,
+            "volume": np.arange(1, len(closes) + 1, dtype=float),
+        },
+        index=index,
+    )
+
+
+def _sim(closes=None, **kwargs) -> ExchangeSimulator:
+    closes = closes if closes is not None else 100.0 + np.arange(600) * 0.1
+    symbol = SimSymbol("BTCUSDT", "BTC", "USDT", _bars(closes), step_size="0.001", min_qty="0.001", min_notional="5")
+    return ExchangeSimulator([symbol], fee_bps=4.0, slippage_bps=10.0, warmup_bars=300, **kwargs)
+
+
+def _order(sim, side, qty, reduce_only=False):
+    params = {"symbol": "BTCUSDT", "side": side, "type": "MARKET", "quantity": qty}
+    if reduce_only:
+        params["reduceOnly"] = "true"
+    return sim.call("POST", "/fapi/v1/order", params, signed=True)
+
+
+def _code(exc_info) -> int:
+    return exc_info.value.code
+
+
+def test_market_order_fills_at_close_with_slippage_and_fee():
+    sim = _sim()
+    close = sim.last_price("BTCUSDT")
+    assert close == Decimal("129.9")
+
+    buy = _order(sim, "BUY", "0.5")
+    sell = _order(sim, "SELL", "0.2")
+
+    buy_px, sell_px = close * Decimal("1.001"), close * Decimal("0.999")
+    assert Decimal(buy["avgPrice"]) == buy_px and Decimal(sell["avgPrice"]) == sell_px
+    fees = (Decimal("0.5") * buy_px + Decimal("0.2") * sell_px) * Decimal("0.0004")
+    realized = (sell_px - buy_px) * Decimal("0.2")
+    account = sim.futures_account()
+    assert Decimal(account["totalWalletBalance"]) == Decimal("10000") + realized - fees
+    assert account["positions"][0]["positionAmt"] == "0.3"
+    assert Decimal(account["positions"][0]["entryPrice"]) == buy_px
+
+
+@pytest.mark.parametrize(
+    "qty, code",
+    [
+        ("0.0015", -1111),  # 不是 stepSize 的整数倍
+        ("0", -1111),
+        ("0.0005", -1111),
+        ("0.03", -4164),  # 名义价值 < 5
+    ],
+)
+def test_filter_rejections(qty, code):
+    sim = _sim()
+
+    with pytest.raises(SimError) as exc:
+        _order(sim, "BUY", qty)
+
+    assert _code(exc) == code
+    assert sim.futures_account()["positions"][0]["positionAmt"] == "0"
+
+
+def test_lot_size_min_qty_rejection():
+    symbol = SimSymbol("BTCUSDT", "BTC", "USDT", _bars(np.full(400, 100.0)), step_size="0.001", min_qty="0.01")
+    sim = ExchangeSimulator([symbol])
+
+    with pytest.raises(SimError) as exc:
+        _order(sim, "BUY", "0.009")
+
+    assert _code(exc) == -1013
+
+
+def test_reduce_only_is_rejected_without_position_and_clamped_to_it():
+    sim = _sim()
+    with pytest.raises(SimError) as exc:
+        _order(sim, "SELL", "0.1", reduce_only=True)
+    assert _code(exc) == -2022
+
+    _order(sim, "BUY", "0.1")
+    with pytest.raises(SimError) as exc:
+        _order(sim, "BUY", "0.1", reduce_only=True)
+    assert _code(exc) == -2022
+
+    res = _order(sim, "SELL", "5", reduce_only=True)
+    assert res["executedQty"] == "0.1"
+    assert sim.futures_account()["positions"][0]["positionAmt"] == "0.0"
+
+
+def test_insufficient_margin_is_rejected():
+    sim = _sim()
+    sim.call("POST", "/fapi/v1/leverage", {"symbol": "BTCUSDT", "leverage": 2}, signed=True)
+
+    with pytest.raises(SimError) as exc:
+        _order(sim, "BUY", "200")
+
+    assert _code(exc) == -2019
+    _order(sim, "BUY", "100")
+
+
+def test_signed_endpoints_need_api_key():
+    with pytest.raises(SimError) as exc:
+        _sim().call("GET", "/fapi/v2/account")
+
+    assert exc.value.status == 401
+
+
+def test_derived_interval_returns_partial_bar_from_closed_base_bars():
+    sim = _sim()
+    sim.advance(25 * MINUTE_MS)  # 05:24:59.999，5:00 的 1h K 线已过去 25 根 1m
+    bars = _bars(100.0 + np.arange(600) * 0.1)
+
+    rows = sim.call("GET", "/fapi/v1/klines", {"symbol": "BTCUSDT", "interval": "1h", "limit": 3})
+
+    part = bars[(bars.index >= "2024-01-01 05:00") & (bars.index <= "2024-01-01 05:24:59.999")]
+    assert len(part) == 25
+    last = rows[-1]
+    assert last[0] == int(pd.Timestamp("2024-01-01 05:00").value // 1_000_000)
+    assert last[6] == last[0] + 60 * MINUTE_MS - 1
+    assert float(last[1]) == part["open"].iloc[0] and float(last[4]) == part["close"].iloc[-1]
+    assert float(last[2]) == part["high"].max() and float(last[3]) == part["low"].min()
+    assert float(last[5]) == part["volume"].sum()
+    # 之前的都是完整的已收盘 K 线
+    assert rows[-2][6] == last[0] - 1
+    assert [r[0] for r in rows] == [last[0] - 2 * 3_600_000, last[0] - 3_600_000, last[0]]
+
+
+def test_base_interval_returns_forming_bar_like_derived_intervals():
+    sim = _sim()
+    at_close = sim.call("GET", "/fapi/v1/klines", {"symbol": "BTCUSDT", "interval": "1m", "limit": 2})
+    assert at_close[-1][6] == sim.server_time()
+
+    sim.advance(30_000)
+    rows = sim.call("GET", "/fapi/v1/klines", {"symbol": "BTCUSDT", "interval": "1m", "limit": 2})
+    hourly = sim.call("GET", "/fapi/v1/klines", {"symbol": "BTCUSDT", "interval": "1h", "limit": 1})
+
+    assert rows[0] == at_close[-1]
+    forming = rows[-1]
+    assert forming[0] <= sim.server_time() < forming[6]
+    assert forming[1] == forming[2] == forming[3] == forming[4] == at_close[-1][4]
+    assert forming[5] == "0"
+    assert hourly[-1][4] == forming[4]
+    ended = sim.call("GET", "/fapi/v1/klines", {"symbol": "BTCUSDT", "interval": "1m", "limit": 2, "endTime": rows[0][6]})
+    assert ended == at_close
+
+
+def _replay_bars() -> pd.DataFrame:
+    # 平台期让 EMA 收敛到相同值（信号 0），其后的单边走势触发开/平仓
+    segments = [(400, 100.0, 100.0), (30, 100.0, 110.0), (400, 110.0, 110.0), (30, 110.0, 104.0), (400, 104.0, 104.0), (30, 104.0, 112.0), (200, 112.0, 112.0)]
+    return _bars(np.concatenate([np.linspace(a, b, n) for n, a, b in segments]))
+
+
+def test_replay_in_process_and_over_http_agree(tmp_path):
+    path = tmp_path / "bars.csv"
+    _replay_bars().to_csv(path)
+    bars = load_bars_csv(str(path))
+
+    local = replay_futures_trader(bars, interval="1m", fast=3, slow=8, transport="inprocess")
+    remote = replay_futures_trader(bars, interval="1m", fast=3, slow=8, transport="http")
+
+    assert local["orders"] >= 2
+    assert local == remote
@@ -0,0 +1,96 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.exchange.binance_futures_client import FuturesSymbolFilters
+from src.exchange.instrument import Instrument, _units, round_to_step
+
+STEPS = ["0.001", "0.00100000", "1", "10", "0.0005"]
+
+
+def _instrument(step: str, min_qty: str | None = None, tick: str = "0.01", min_notional: str | None = "5") -> Instrument:
+    filters = FuturesSymbolFilters(
+        lot_step_size=Decimal(step),
+        lot_min_qty=Decimal(min_qty or step),
+        price_tick_size=Decimal(tick),
+        min_notional=Decimal(min_notional) if min_notional is not None else None,
+    )
+    return Instrument.from_filters("BTCUSDT", filters)
+
+
+def _decimal(rng: random.Random, places: int) -> Decimal:
+    digits = rng.randint(0, 10 ** rng.randint(1, 9))
+    value = Decimal(digits).scaleb(-rng.randint(0, places))
+    return -value if rng.random() < 0.2 else value
+
+
+@pytest.mark.parametrize("step", STEPS)
+def test_round_qty_matches_round_to_step_digit_for_digit(step):
+    rng = random.Random(34)
+    inst = _instrument(step)
+    step_d = Decimal(step)
+    values = [_decimal(rng, 12) for _ in range(2000)]
+    # 恰好落在步长上、以及带尾随零的输入
+    values += [step_d * k for k in range(0, 50)] + [Decimal("0.1000000000"), Decimal("-0.0001"), Decimal("25.0")]
+    for value in values:
+        assert str(inst.round_qty(value)) == str(round_to_step(value, step_d)), value
+
+
+def test_round_price_matches_round_to_step():
+    rng = random.Random(35)
+    inst = _instrument("0.001", tick="0.10")
+    for _ in range(1000):
+        value = _decimal(rng, 8)
+        assert str(inst.round_price(value)) == str(round_to_step(value, Decimal("0.10")))
+
+
+@pytest.mark.parametrize("step", STEPS)
+def test_size_orders_matches_scalar_size(step):
+    rng = random.Random(36)
+    inst = _instrument(step)
+    step_d = Decimal(step)
+    quote = [round(rng.uniform(5, 50_000), 2) for _ in range(3000)]
+    price = [round(rng.uniform(0.01, 70_000), rng.randint(0, 4)) for _ in range(3000)]
+    leverage = [rng.choice([1, 2, 3, 5, 10, 20, 125]) for _ in range(3000)]
+    # 精确落在步长边界上的订单：浮点除法在这里最容易差一个步长
+    for k in (1, 3, 7, 29, 300):
+        for p in ("0.1", "0.3", "1.1", "3", "123.45"):
+            quote.append(float(step_d * k * Decimal(p)))
+            price.append(float(p))
+            leverage.append(1)
+    units = inst.size_orders(quote, price, leverage)
+    assert units.dtype == np.int64
+    for q, p, lev, u in zip(quote, price, leverage, units):
+        expected = inst.size(Decimal(str(q)), Decimal(str(p)), Decimal(lev))
+        assert int(u) == _units(expected, inst.qty_decimals), (q, p, lev)
+        assert inst.qty_str(int(u)) == str(expected)
+
+
+@pytest.mark.parametrize("step", ["0.001", "0.00100000", "0.0005"])
+def test_check_orders_matches_check_near_min_notional(step):
+    rng = random.Random(37)
+    inst = _instrument(step)
+    units, price = [], []
+    for _ in range(2000):
+        p = Decimal(rng.randint(1, 10_000_000)).scaleb(-2)
+        boundary = _units(Decimal(5) / p, inst.qty_decimals)
+        for u in range(boundary - 2, boundary + 3):
+            units.append(u)
+            price.append(float(p))
+    # 名义价值恰好等于 minNotional
+    for qty, p in (("0.4", "12.5"), ("100", "0.05"), ("4", "1.25"), ("2", "2.5"), ("0.05", "100"), ("0.002", "2500")):
+        units.append(_units(Decimal(qty), inst.qty_decimals))
+        price.append(float(p))
+    mask = inst.check_orders(units, price)
+    for u, p, ok in zip(units, price, mask):
+        qty = Decimal(u).scaleb(-inst.qty_decimals)
+        assert bool(ok) == (inst.check(qty, Decimal(str(p))) is None), (qty, p)
+
+
+def test_check_orders_without_min_notional():
+    inst = _instrument("0.001", min_qty="0.005", min_notional=None)
+    mask = inst.check_orders([0, 4, 5, 6], 1.0)
+    assert mask.tolist() == [False, False, True, True]
+    assert [inst.check(Decimal(u).scaleb(-3), Decimal(1)) is None for u in (0, 4, 5, 6)] == mask.tolist()
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+from src.gateway.kline_gateway import KlineGateway
+
+MINUTE_MS = 60_000
+# 以 1m 为单位的虚拟时钟起点（整分钟）
+T0 = 1_700_000_040.0
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _rows(last_close_ms: int, n: int):
+    rows = []
+    for i in range(n):
+        close = last_close_ms - (n - 1 - i) * MINUTE_MS
+        rows.append([close - MINUTE_MS + 1, "1", "1", "1", "1", "1", close, "1", 1, "1", "1", "0"])
+    return rows
+
+
+@pytest.fixture
+def upstream():
+    """Fake fapi host: answers from the shared clock, advancing it by ``latency`` first."""
+    state = {"clock": FakeClock(T0), "latency": 0.0, "calls": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            state["calls"] += 1
+            params = dict(parse_qsl(urlsplit(self.path).query))
+            if params["symbol"] == "BAD":
+                body = json.dumps({"code": -1121, "msg": "Invalid symbol."}).encode()
+                self.send_response(400)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            clock = state["clock"]
+            # 服务端在应答时刻所见的最新K线（可能尚未收盘）
+            forming_close = (int(clock.now * 1000) // MINUTE_MS + 1) * MINUTE_MS - 1
+            last = int(params["endTime"]) if "endTime" in params else forming_close
+            body = json.dumps(_rows(last, int(params.get("limit", 500)))).encode()
+            clock.now += state["latency"]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _gateway(upstream) -> KlineGateway:
+    return KlineGateway(fapi_urls=[upstream["url"]], ttl=3.0, closed_ttl=3600.0, clock=upstream["clock"])
+
+
+def _entry(gw: KlineGateway, params):
+    return gw._cache[("/fapi/v1/klines", tuple(sorted(params.items())))]
+
+
+def test_latest_bars_answered_across_bar_close_use_short_ttl(upstream):
+    clock = upstream["clock"]
+    # 收盘前 40ms 应答，100ms 延迟后才到达网关
+    clock.now = T0 + 60 - 0.04
+    upstream["latency"] = 0.1
+    gw = _gateway(upstream)
+    params = {"symbol": "BTCUSDT", "interval": "1m", "limit": "100"}
+
+    asyncio.run(gw.get_klines("/fapi/v1/klines", params))
+
+    assert _entry(gw, params).expires_at - clock.now <= gw.ttl
+    clock.now += gw.ttl + 0.01
+    asyncio.run(gw.get_klines("/fapi/v1/klines", params))
+    assert upstream["calls"] == 2
+
+
+def test_explicit_past_window_uses_closed_ttl(upstream):
+    clock = upstream["clock"]
+    gw = _gateway(upstream)
+    end_ms = int(T0 * 1000) - 10 * MINUTE_MS - 1
+    params = {"symbol": "BTCUSDT", "interval": "1m", "limit": "5", "endTime": str(end_ms)}
+
+    asyncio.run(gw.get_klines("/fapi/v1/klines", params))
+
+    assert _entry(gw, params).expires_at - clock.now == pytest.approx(gw.closed_ttl)
+
+
+def test_window_ending_within_skew_stays_short(upstream):
+    clock = upstream["clock"]
+    gw = _gateway(upstream)
+    params = {"symbol": "BTCUSDT", "interval": "1m", "limit": "5", "endTime": str(int(T0 * 1000) - 1)}
+    clock.now = T0 + 1.0
+
+    asyncio.run(gw.get_klines("/fapi/v1/klines", params))
+
+    assert _entry(gw, params).expires_at - clock.now <= gw.ttl
+
+
+def test_concurrent_identical_requests_are_coalesced(upstream):
+    upstream["clock"].now = T0 + 10
+    gw = _gateway(upstream)
+    params = {"symbol": "BTCUSDT", "interval": "1m", "limit": "10"}
+
+    async def burst():
+        return await asyncio.gather(*[gw.get_klines("/fapi/v1/klines", dict(params)) for _ in range(20)])
+
+    bodies = asyncio.run(burst())
+
+    assert len(set(bodies)) == 1
+    assert upstream["calls"] == 1
+
+
+def _serve_status(status: int):
+    class Handler(BaseHTTPRequestHandler):
+        calls = 0
+
+        def do_GET(self):  # noqa: N802
+            Handler.calls += 1
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_upstream_4xx_is_forwarded_without_retry_or_failover(upstream):
+    gw = KlineGateway(fapi_urls=[upstream["url"], upstream["url"]], clock=upstream["clock"])
+
+    status, body = asyncio.run(gw._route("GET", "/fapi/v1/klines?symbol=BAD&interval=1m"))
+
+    assert status == 400
+    assert json.loads(body) == {"code": -1121, "msg": "Invalid symbol."}
+    assert upstream["calls"] == 1
+    assert not gw._cache
+
+
+def test_upstream_5xx_fails_over_to_next_host(upstream):
+    server, handler, url = _serve_status(503)
+    try:
+        gw = KlineGateway(fapi_urls=[url, upstream["url"]], clock=upstream["clock"])
+
+        status, body = asyncio.run(gw._route("GET", "/fapi/v1/klines?symbol=BTCUSDT&interval=1m&limit=2"))
+
+        assert status == 200 and len(json.loads(body)) == 2
+        assert handler.calls == 1 and upstream["calls"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_all_hosts_failing_is_bad_gateway():
+    server, handler, url = _serve_status(500)
+    try:
+        gw = KlineGateway(fapi_urls=[url, url])
+
+        status, body = asyncio.run(gw._route("GET", "/fapi/v1/klines?symbol=BTCUSDT&interval=1m"))
+
+        assert status == 502 and json.loads(body)["error"] == "upstream failed"
+        assert handler.calls == 2
+    finally:
+        server.shutdown()
+        server.server_close()
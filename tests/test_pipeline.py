@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from src.strategy.pipeline import FeatureCache, compute_features, ema, ema_cross
+
+
+def _frame(n: int = 500) -> pd.DataFrame:
+    close = 100.0 + np.cumsum(np.random.default_rng(0).normal(size=n))
+    df = pd.DataFrame({"close": close}, index=pd.date_range("2024-01-01", periods=n, freq="1min"))
+    df.attrs["version"] = ("bus", 42)
+    return df
+
+
+def test_slices_of_versioned_frame_get_their_own_cache_bucket():
+    df = _frame()
+    nodes = [ema(5, name="ema_5"), *ema_cross(12, 26)]
+    cache = FeatureCache()
+
+    full = compute_features(df, nodes, cache=cache)
+    # pandas 会把 attrs 复制到切片上
+    tail = compute_features(df.iloc[-100:], nodes, cache=cache)
+
+    assert len(full) == 500 and len(tail) == 100
+    expected = compute_features(df.iloc[-100:], nodes, cache=None)
+    pd.testing.assert_frame_equal(tail, expected)
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data.archive_import import OHLCV, read_archive
+from src.data.resample import KlineResampler, resample_klines
+
+FIXTURES = Path(__file__).parent / "fixtures" / "klines"
+# 每个 1m 归档与同名 1h/1d 归档成对放置（data.binance.vision 的 USDM 格式）。
+# 自带的 BTCUSDT-*-2024-01 为两天的离线样本，1h/1d 由十进制逐行汇总得到；
+# 放入官方下载的同月归档即可直接对照交易所K线
+CASES = [
+    (base, interval)
+    for base in sorted(FIXTURES.glob("*-1m-*.zip"))
+    for interval in ("1h", "1d")
+    if (FIXTURES / base.name.replace("-1m-", f"-{interval}-")).exists()
+]
+
+
+def _assert_bars_equal(got: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert got.index.equals(expected.index)
+    pd.testing.assert_frame_equal(got[["open", "high", "low", "close"]], expected[["open", "high", "low", "close"]], check_exact=True)
+    # 成交量是十进制字符串求和，浮点累加只差舍入误差
+    pd.testing.assert_series_equal(got["volume"], expected["volume"], check_exact=False, rtol=1e-12)
+
+
+@pytest.mark.parametrize("base, interval", CASES, ids=[f"{b.stem}-{iv}" for b, iv in CASES])
+def test_resampled_bars_match_exchange_bars(base, interval):
+    df_1m = read_archive(base)
+    expected = read_archive(FIXTURES / base.name.replace("-1m-", f"-{interval}-"))
+
+    _assert_bars_equal(resample_klines(df_1m, interval), expected[OHLCV])
+
+
+@pytest.mark.parametrize("base, interval", CASES, ids=[f"{b.stem}-{iv}" for b, iv in CASES])
+def test_incremental_updates_match_exchange_bars(base, interval):
+    df_1m = read_archive(base)
+    expected = read_archive(FIXTURES / base.name.replace("-1m-", f"-{interval}-"))
+    resampler = KlineResampler([interval])
+
+    # 块大小不对齐周期边界，且每块重发上一根（未收盘）1m K线
+    start = 0
+    for size in [1, 7, 59, 61, 500] * 100:
+        if start >= len(df_1m):
+            break
+        resampler.update(df_1m.iloc[max(start - 1, 0) : start + size])
+        start += size
+
+    _assert_bars_equal(resampler.frame(interval), expected[OHLCV])
+
+
+def test_fixtures_present():
+    assert CASES
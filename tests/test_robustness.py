@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from src.backtest.robustness import run_robustness
+
+
+def _result(n: int = 2000) -> dict:
+    position = pd.Series((np.arange(n) // 50) % 2, dtype=float)
+    returns = pd.Series(np.random.default_rng(0).normal(0.0, 0.01, n) * position)
+    return {"returns": returns, "position": position, "data": pd.DataFrame({"cross": position.diff().fillna(0)})}
+
+
+def test_trade_resampling_has_spread_and_no_sharpe():
+    table = run_robustness(_result(), n_paths=300, seed=7)
+
+    trades = table.loc["trade_bootstrap"]
+    assert list(trades.index) == ["return_pct", "max_dd_pct"]
+    assert (trades["upper"] > trades["lower"]).all()
+
+
+def test_results_depend_on_seed_only():
+    a = run_robustness(_result(), n_paths=300, seed=7, workers=1)
+    b = run_robustness(_result(), n_paths=300, seed=7, workers=2)
+
+    pd.testing.assert_frame_equal(a, b)
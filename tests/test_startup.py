@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import pytest
+
+from src.startup_check import DEFAULT_TARGETS, forbidden_imports, measure
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize("target", DEFAULT_TARGETS)
+def test_fast_path_imports_no_heavy_modules(target, monkeypatch):
+    # 子进程按当前目录解析 src 包
+    monkeypatch.chdir(ROOT)
+
+    self_us, _ = measure([target])
+
+    assert target in self_us
+    assert forbidden_imports(self_us) == []
+
+
+def test_forbidden_imports_reports_top_level_packages():
+    assert forbidden_imports({"pandas.core.frame": 1, "dotenv": 1, "json": 1}) == ["dotenv", "pandas"]
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.backtester import run_backtest
+from src.backtest.tick_backtester import TickBacktester
+from src.data.aggtrades import TickChunk
+
+T0 = 1_704_067_200_000
+MINUTE_MS = 60_000
+LATENCY = 50
+FEE = 10 / 10000.0
+
+# (time ms, price, buyer is maker)；fast=1 / slow=2 时第 1 根收盘发出买入、第 3 根收盘发出卖出
+TAPE = [
+    (T0 + 1_000, 100.0, False),
+    (T0 + MINUTE_MS + 1_000, 101.0, False),
+    # 第 2 根：买单在 T0 + 2min + 50ms 到达
+    (T0 + 2 * MINUTE_MS + 10, 101.1, False),  # 到达前，不可成交
+    (T0 + 2 * MINUTE_MS + 50, 101.2, True),  # 恰好到达时刻，主动卖
+    (T0 + 2 * MINUTE_MS + 60, 101.3, True),
+    (T0 + 2 * MINUTE_MS + 70, 101.4, False),  # 到达后第一笔主动买
+    (T0 + 2 * MINUTE_MS + 80, 101.5, False),
+    (T0 + 2 * MINUTE_MS + 30_000, 102.0, True),
+    (T0 + 3 * MINUTE_MS + 5, 99.0, True),
+    # 第 4 根：卖单在 T0 + 4min + 50ms 到达
+    (T0 + 4 * MINUTE_MS + 20, 98.9, True),  # 到达前，不可成交
+    (T0 + 4 * MINUTE_MS + 50, 98.8, False),
+    (T0 + 4 * MINUTE_MS + 100, 98.7, True),  # 到达后第一笔主动卖
+    (T0 + 4 * MINUTE_MS + 200, 98.6, True),
+    (T0 + 4 * MINUTE_MS + 30_000, 98.5, False),
+]
+
+
+def _chunks(size: int):
+    for i in range(0, len(TAPE), size):
+        rows = TAPE[i : i + size]
+        yield TickChunk(
+            np.array([t for t, _, _ in rows], dtype=np.int64),
+            np.array([p for _, p, _ in rows], dtype=float),
+            np.ones(len(rows)),
+            np.array([m for _, _, m in rows], dtype=bool),
+        )
+
+
+def _run(size: int = len(TAPE), **kwargs) -> dict:
+    engine = TickBacktester(interval="1m", fast=1, slow=2, fee_bps=10.0, latency_ms=LATENCY, **kwargs)
+    for chunk in _chunks(size):
+        engine.feed(chunk)
+    return engine.finish()
+
+
+def _fill(i: int):
+    return TAPE[i][0], TAPE[i][1]
+
+
+@pytest.mark.parametrize(
+    "match_side, queue_trades, buy, sell",
+    [
+        (True, 0, 5, 11),  # 买单跳过主动卖成交，卖单跳过主动买成交
+        (False, 0, 3, 10),  # 不区分方向：到达后第一笔成交
+        (True, 1, 6, 12),  # 前面排队一笔同向成交
+        (False, 2, 5, 12),
+    ],
+)
+def test_fills_at_first_eligible_trade_after_latency(match_side, queue_trades, buy, sell):
+    stats = _run(match_side=match_side, queue_trades=queue_trades)
+
+    (tb, b), (ts, s) = _fill(buy), _fill(sell)
+    equity = (102.0 / b - FEE) * (99.0 / 102.0) * (s / 99.0 - FEE)
+    assert stats["bars"] == 5 and stats["trades"] == 2 and stats["ticks"] == len(TAPE)
+    assert stats["final_equity"] == pytest.approx(equity, rel=1e-12)
+    assert stats["avg_fill_delay_ms"] == ((tb - (T0 + 2 * MINUTE_MS)) + (ts - (T0 + 4 * MINUTE_MS))) / 2
+    assert stats["avg_slippage_bps"] == pytest.approx(((b / 101.0 - 1) - (s / 99.0 - 1)) / 2 * 10000.0)
+
+
+def test_unfilled_order_is_cancelled_by_the_opposite_signal():
+    # 买单排在 2 笔主动买之后，第 2 根里再没有主动买；第 3 根收盘转空后撤单，全程空仓
+    stats = _run(match_side=True, queue_trades=2)
+    assert stats["bars"] == 5 and stats["trades"] == 0
+    assert stats["final_equity"] == 1.0 and stats["avg_fill_delay_ms"] == 0.0
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5])
+@pytest.mark.parametrize("queue_trades", [0, 1])
+def test_chunk_boundaries_do_not_change_fills(size, queue_trades):
+    assert _run(size, queue_trades=queue_trades) == _run(queue_trades=queue_trades)
+
+
+def test_stats_keys_match_run_backtest():
+    closes = np.array([t[1] for t in TAPE])
+    df = pd.DataFrame(
+        {"open": closes, "high": closes, "low": closes, "close": closes, "volume": 1.0},
+        index=pd.date_range("2024-01-01", periods=len(closes), freq="1min", name="close_time"),
+    )
+    expected = run_backtest(df, fast=1, slow=2)["stats"]
+    stats = _run()
+    assert list(stats)[: len(expected)] == list(expected)
+    assert {k: type(stats[k]) for k in expected} == {k: type(v) for k, v in expected.items()}
+    assert stats["start"] == "2024-01-01 00:00:59.999000" and stats["end"] == "2024-01-01 00:04:59.999000"
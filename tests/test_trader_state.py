@@ -0,0 +1,173 @@
+import argparse
+import math
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import main
+from src.backtest.backtester import run_backtest
+from src.exchange.binance_futures_client import FuturesSymbolFilters
+from src.live.futures_trader import EMAFuturesTrader
+from src.live.state import TraderStateStore
+from src.risk.performance import PerformanceTracker
+
+HOUR_MS = 3_600_000
+
+
+class FakeClient:
+    """Hourly klines of a sine wave, served up to ``bars``; enough for EMA crosses."""
+
+    def __init__(self) -> None:
+        self.bars = 300
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500):
+        rows = []
+        for i in range(max(0, self.bars - limit), self.bars):
+            close = 100.0 + 10.0 * math.sin(i / 15.0)
+            rows.append([i * HOUR_MS, close, close, close, close, 1.0, (i + 1) * HOUR_MS - 1, 0, 0, 0, 0, 0])
+        return rows
+
+
+def _trader(client) -> EMAFuturesTrader:
+    return EMAFuturesTrader(client, "BTCUSDT", interval="1h", fast=3, slow=8, dry_run=True)
+
+
+def test_one_step_per_process_accumulates_like_a_long_running_trader(tmp_path):
+    client = FakeClient()
+    resident = _trader(client)
+    for i in range(120):
+        client.bars += 1
+        resident.step()
+
+        store = TraderStateStore(tmp_path)
+        one_shot = _trader(client)
+        store.attach(one_shot)
+        one_shot.step()
+        if i == 10:
+            # 持仓要跨进程延续：入场价与持仓K线都来自状态文件
+            resident._open_long(Decimal("100"))
+            one_shot._open_long(Decimal("100"))
+        store.save(one_shot)
+
+    expected = resident.performance.snapshot()
+    assert expected.bars == 119 and expected.trades == 1 and expected.exposure_pct > 0
+    assert TraderStateStore(tmp_path).load_all() == {"BTCUSDT_1h": expected}
+
+
+def test_repeated_step_within_a_bar_counts_once(tmp_path):
+    client = FakeClient()
+    for _ in range(3):
+        store = TraderStateStore(tmp_path)
+        trader = _trader(client)
+        store.attach(trader)
+        trader.step()
+        store.save(trader)
+
+    assert TraderStateStore(tmp_path).load_all()["BTCUSDT_1h"].bars == 0
+
+
+def _step_args(state_dir) -> argparse.Namespace:
+    return argparse.Namespace(
+        cmd="futures-paper", symbol="BTCUSDT", interval="1h", fast=3, slow=8, leverage=5, bus=None, state_dir=state_dir
+    )
+
+
+def test_state_is_only_persisted_to_a_configured_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "_futures_client", lambda bus=None: FakeClient())
+    main.cmd_futures_step(_step_args(None))
+    assert list(tmp_path.iterdir()) == []
+
+    main.cmd_futures_step(_step_args(str(tmp_path / "state")))
+    assert (tmp_path / "state" / "futures-paper" / "BTCUSDT_1h.json").exists()
+
+
+def test_failed_state_save_does_not_fail_the_step(tmp_path, monkeypatch, capsys):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setattr(main, "_futures_client", lambda bus=None: FakeClient())
+    main.cmd_futures_step(_step_args(str(blocker)))
+    captured = capsys.readouterr()
+    assert "could not save trader state" in captured.err
+    assert "Performance (BTCUSDT_1h)" in captured.out
+
+
+class FakeOrderClient(FakeClient):
+    """Fills market orders from a scripted list of responses and records what was sent."""
+
+    def __init__(self, fills) -> None:
+        super().__init__()
+        self.fills = list(fills)
+        self.orders = []
+
+    def get_symbol_filters(self, symbol: str) -> FuturesSymbolFilters:
+        return FuturesSymbolFilters(Decimal("0.001"), Decimal("0.001"), Decimal("0.01"), Decimal("5"))
+
+    def change_leverage(self, symbol: str, leverage: int):
+        return {}
+
+    def new_market_order(self, symbol, side, quantity, reduce_only=False, position_side=None):
+        self.orders.append((side, quantity, reduce_only))
+        avg, executed = self.fills.pop(0)
+        return {"orderId": len(self.orders), "avgPrice": avg, "executedQty": executed}
+
+
+def _live_trader(client) -> EMAFuturesTrader:
+    return EMAFuturesTrader(client, "BTCUSDT", fast=3, slow=8, leverage=5, quote_per_trade=Decimal("10"), dry_run=False)
+
+
+def test_live_fills_are_booked_at_avg_price():
+    client = FakeOrderClient([("101.5", "0.492"), ("98.25", "0.492")])
+    trader = _live_trader(client)
+    trader._open_long(Decimal("100"))
+    assert trader.state()["entry_price"] == "101.5" and trader.state()["entry_qty"] == "0.492"
+
+    trader._close_long(Decimal("110"))
+    assert client.orders[1] == ("SELL", Decimal("0.492"), True)
+    snap = trader.performance.snapshot()
+    # 按成交均价计亏损，而不是按信号K线收盘价计盈利
+    assert (snap.trades, snap.closed_trades, snap.win_rate_pct) == (2, 1, 0.0)
+    assert trader.state()["entry_price"] is None and trader.state()["entry_qty"] is None
+
+
+def test_partial_reduce_keeps_the_position_until_flat(tmp_path):
+    client = FakeOrderClient([("100", "0.5"), ("101", "0.2"), ("102", "0.3")])
+    trader = _live_trader(client)
+    trader._open_long(Decimal("100"))
+    trader._close_long(Decimal("101"))
+    assert trader.state()["entry_price"] == "100" and trader.state()["entry_qty"] == "0.3"
+    assert trader.performance.snapshot().closed_trades == 0
+
+    # 剩余数量随状态文件跨进程保留，下一次平仓按剩余数量下单
+    store = TraderStateStore(tmp_path)
+    store.save(trader)
+    resumed = _live_trader(client)
+    store.attach(resumed)
+    resumed._close_long(Decimal("102"))
+    assert client.orders[-1] == ("SELL", Decimal("0.3"), True)
+    assert resumed.state()["entry_price"] is None
+    assert resumed.performance.snapshot().closed_trades == 1
+
+
+def test_from_backtest_matches_backtest_stats():
+    # 开头的平台期让 EMA 相等（信号 0），随后的随机游走触发入场并带来回撤
+    rng = np.random.default_rng(37)
+    walk = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, 800)))
+    closes = np.r_[np.full(50, 100.0), walk]
+    df = pd.DataFrame(
+        {"open": closes, "high": closes, "low": closes, "close": closes, "volume": 1.0},
+        index=pd.date_range("2024-01-01", periods=len(closes), freq="1h", name="close_time"),
+    )
+    result = run_backtest(df, fast=3, slow=8)
+    stats = result["stats"]
+    snap = PerformanceTracker.from_backtest(result).snapshot()
+
+    assert stats["trades"] >= 1 and stats["max_dd_pct"] < 0
+    assert snap.bars == stats["bars"]
+    assert snap.trades == stats["trades"]
+    assert snap.final_equity == pytest.approx(stats["final_equity"], rel=1e-12)
+    assert snap.return_pct == pytest.approx(stats["return_pct"], rel=1e-9, abs=1e-12)
+    assert snap.max_dd_pct == pytest.approx(stats["max_dd_pct"], rel=1e-9, abs=1e-12)
+    assert snap.sharpe == pytest.approx(stats["sharpe"], rel=1e-9)
@@ -7,6 +7,11 @@ export default defineConfig({
 		port: 5173,
 		open: true,
 		proxy: {
+			// 本地 K 线网关：python -m src.main gateway
+			'/klines': {
+				target: 'http://127.0.0.1:8787',
+				changeOrigin: true,
+			},
 			'/fapi1': {
 				target: 'https://fapi1.binance.com',
 				changeOrigin: true,